@@ -0,0 +1,49 @@
+"""Shared validity-mask loader for the colab check scripts."""
+import os
+import pickle
+from functools import lru_cache
+
+import pandas as pd
+
+# Spelled-out case variants so the check needs no lowercase pass
+MISSING_VALUES = frozenset({'', 'nan', 'NaN', 'NAN', 'none', 'None', 'NONE', 'null', 'Null', 'NULL'})
+
+
+@lru_cache(maxsize=None)
+def _read_tsv(path):
+    """Read the TSV once as raw strings, reusing a pickle cache keyed by mtime."""
+    cache_path = os.path.join(os.path.dirname(path), f'.{os.path.basename(path)}.validity.pkl')
+    mtime = os.path.getmtime(path)
+
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached['mtime'] == mtime:
+            return cached['df']
+
+    df = pd.read_csv(path, sep='\t', dtype=str, keep_default_na=False, low_memory=False)
+    try:
+        with open(cache_path, 'wb') as f:
+            pickle.dump({'mtime': mtime, 'df': df}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # Read-only data directory: just skip the cache
+        pass
+    return df
+
+
+def load_validity(path, cols, markers=MISSING_VALUES):
+    """
+    Load `cols` from a TSV and compute which cells hold a real value.
+
+    Returns (df, valid) where `valid[:, i]` is True when `cols[i]`, stripped, is
+    not one of `markers` (by default empty or a nan/none/null spelling; pass
+    frozenset({''}) to count only empty cells). Columns absent from the file
+    count as missing.
+    """
+    df = _read_tsv(path).reindex(columns=cols, fill_value='')
+
+    # Column positions are fixed by `cols`; test every cell in one flat pass
+    cells = df.to_numpy(dtype=object)
+    flat = pd.Series(cells.ravel(order='F'))
+    valid = ~flat.str.strip().isin(markers).to_numpy().reshape(cells.shape, order='F')
+    return df, valid
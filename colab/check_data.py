@@ -1,64 +1,40 @@
 #!/usr/bin/env python3
-import csv
-from collections import defaultdict
+from _validity import load_validity
 
 # Read TSV file
 filename = '20260128_experiment_datasource.tsv'
 
-# Track counts
-counts = defaultdict(lambda: {'valid': 0, 'missing': 0})
-total_rows = 0
-
 # Columns to check
 actual_cols = ['actual_weight', 'actual_d1', 'actual_d2', 'actual_d3', 'actual_max', 'actual_mid', 'actual_min']
 ai_cols = ['ai_weight_kg', 'ai_width_cm', 'ai_depth_cm', 'ai_height_cm', 'ai_max', 'ai_mid', 'ai_min']
 error_cols = ['weight_error', 'volume_error', 'max_error', 'mid_error', 'min_error']
 all_cols = actual_cols + ai_cols + error_cols
+col_idx = {col: i for i, col in enumerate(all_cols)}
+
+# Boolean (rows x columns) validity matrix, shared with check_missing.py
+_, valid = load_validity(filename, all_cols)
+total_rows = len(valid)
+
+# Track counts
+valid_counts = valid.sum(axis=0)
+counts = {col: {'valid': int(valid_counts[i]), 'missing': total_rows - int(valid_counts[i])}
+          for i, col in enumerate(all_cols)}
 
 # Combined checks
-both_weight_count = 0
-both_dims_count = 0
-both_errors_count = 0
-complete_data_count = 0
+def all_valid(cols):
+    return valid[:, [col_idx[c] for c in cols]].all(axis=1)
+
+actual_weight_ok = valid[:, col_idx['actual_weight']]
+ai_weight_ok = valid[:, col_idx['ai_weight_kg']]
+actual_dims_ok = all_valid(['actual_d1', 'actual_d2', 'actual_d3'])
+ai_dims_ok = all_valid(['ai_width_cm', 'ai_depth_cm', 'ai_height_cm'])
+weight_error_ok = valid[:, col_idx['weight_error']]
+volume_error_ok = valid[:, col_idx['volume_error']]
 
-with open(filename, 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f, delimiter='\t')
-    
-    for row in reader:
-        total_rows += 1
-        
-        # Count valid/missing for each column
-        for col in all_cols:
-            val = row.get(col, '').strip()
-            if val and val.lower() not in ('', 'nan', 'none', 'null'):
-                counts[col]['valid'] += 1
-            else:
-                counts[col]['missing'] += 1
-        
-        # Combined checks
-        actual_weight_ok = row.get('actual_weight', '').strip() not in ('', 'nan', 'none', 'null')
-        ai_weight_ok = row.get('ai_weight_kg', '').strip() not in ('', 'nan', 'none', 'null')
-        
-        actual_dims_ok = all(
-            row.get(col, '').strip() not in ('', 'nan', 'none', 'null') 
-            for col in ['actual_d1', 'actual_d2', 'actual_d3']
-        )
-        ai_dims_ok = all(
-            row.get(col, '').strip() not in ('', 'nan', 'none', 'null')
-            for col in ['ai_width_cm', 'ai_depth_cm', 'ai_height_cm']
-        )
-        
-        weight_error_ok = row.get('weight_error', '').strip() not in ('', 'nan', 'none', 'null')
-        volume_error_ok = row.get('volume_error', '').strip() not in ('', 'nan', 'none', 'null')
-        
-        if actual_weight_ok and ai_weight_ok:
-            both_weight_count += 1
-        if actual_dims_ok and ai_dims_ok:
-            both_dims_count += 1
-        if weight_error_ok and volume_error_ok:
-            both_errors_count += 1
-        if actual_weight_ok and ai_weight_ok and actual_dims_ok and ai_dims_ok:
-            complete_data_count += 1
+both_weight_count = int((actual_weight_ok & ai_weight_ok).sum())
+both_dims_count = int((actual_dims_ok & ai_dims_ok).sum())
+both_errors_count = int((weight_error_ok & volume_error_ok).sum())
+complete_data_count = int((actual_weight_ok & ai_weight_ok & actual_dims_ok & ai_dims_ok).sum())
 
 # Print results
 print(f'Total rows: {total_rows:,}')
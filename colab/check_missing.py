@@ -1,31 +1,25 @@
 #!/usr/bin/env python3
-import csv
+from _validity import load_validity
 
 filename = '20260128_experiment_datasource.tsv'
 
+cols = ['product_version_id', 'ai_weight_kg', 'ai_width_cm', 'ai_depth_cm', 'ai_height_cm',
+        'ai_volume_str', 'actual_weight', 'category']
+ai_dim_cols = ['ai_width_cm', 'ai_depth_cm', 'ai_height_cm']
+
+# Boolean (rows x columns) validity matrix, shared with check_data.py
+df, valid = load_validity(filename, cols)
+col_idx = {col: i for i, col in enumerate(cols)}
+dim_idx = [col_idx[c] for c in ai_dim_cols]
+total = len(df)
+
 # Check rows where ai_weight_kg is missing
-missing_ai_weight = []
-missing_ai_dims = []
-total = 0
+ai_weight_missing = ~valid[:, col_idx['ai_weight_kg']]
+missing_ai_weight = df[ai_weight_missing]
 
-with open(filename, 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f, delimiter='\t')
-    
-    for row in reader:
-        total += 1
-        
-        ai_weight = row.get('ai_weight_kg', '').strip()
-        ai_w = row.get('ai_width_cm', '').strip()
-        ai_d = row.get('ai_depth_cm', '').strip()
-        ai_h = row.get('ai_height_cm', '').strip()
-        
-        # Check if AI weight is missing
-        if not ai_weight or ai_weight.lower() in ('nan', 'none', 'null'):
-            missing_ai_weight.append(row)
-        
-        # Check if AI dimensions are missing
-        if not ai_w or not ai_d or not ai_h:
-            missing_ai_dims.append(row)
+# Check if AI dimensions are missing (only empty cells count here, not nan/none/null)
+_, dims_present = load_validity(filename, ai_dim_cols, markers=frozenset({''}))
+missing_ai_dims = df[~dims_present.all(axis=1)]
 
 print(f"Total rows: {total:,}")
 print(f"Missing ai_weight_kg: {len(missing_ai_weight):,}")
@@ -36,7 +30,7 @@ print("\n" + "=" * 60)
 print("SAMPLE ROWS WITH MISSING AI WEIGHT (first 5):")
 print("=" * 60)
 
-for i, row in enumerate(missing_ai_weight[:5]):
+for i, row in enumerate(missing_ai_weight.head(5).to_dict('records')):
     print(f"\nRow {i+1}:")
     print(f"  product_version_id: {row.get('product_version_id', '')[:30]}...")
     print(f"  ai_weight_kg: '{row.get('ai_weight_kg', '')}'")
@@ -52,20 +46,10 @@ print("\n" + "=" * 60)
 print("PATTERN ANALYSIS:")
 print("=" * 60)
 
-all_ai_missing = 0
-partial_ai_missing = 0
-
-for row in missing_ai_weight:
-    ai_w = row.get('ai_width_cm', '').strip()
-    ai_d = row.get('ai_depth_cm', '').strip()
-    ai_h = row.get('ai_height_cm', '').strip()
-    
-    all_empty = all(not x or x.lower() in ('nan', 'none', 'null', '') for x in [ai_w, ai_d, ai_h])
-    
-    if all_empty:
-        all_ai_missing += 1
-    else:
-        partial_ai_missing += 1
+# Among rows missing AI weight, are the dimensions missing too?
+all_empty = ~valid[ai_weight_missing][:, dim_idx].any(axis=1)
+all_ai_missing = int(all_empty.sum())
+partial_ai_missing = len(all_empty) - all_ai_missing
 
 print(f"Rows with ALL AI data missing (weight + dims): {all_ai_missing}")
 print(f"Rows with only weight missing (dims exist): {partial_ai_missing}")
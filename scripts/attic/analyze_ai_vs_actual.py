@@ -13,6 +13,44 @@ import numpy as np
 from pathlib import Path
 
 
+def best_factors(ai, w, bin_ids, n_bins, factors):
+    """
+    모든 구간의 최적 보정 계수를 한 번에 탐색
+
+    후보 계수마다 구간별 오차 합을 np.bincount로 모아 (계수 x 구간) MAE 행렬을 만들고,
+    구간별로 MAE가 최소인 계수를 고른다.
+
+    기존 Series.mean() 루프와 같은 규칙: NaN 오차만 평균에서 빠지고, 실제 무게 0으로 생긴
+    inf 오차는 그대로 남아 그 계수의 MAE를 inf로 만든다. 유한한 MAE가 하나도 없는 구간은
+    계수 1.0, MAE inf.
+
+    Returns:
+        (구간별 최적 계수, 구간별 최적 MAE %)
+    """
+    in_bin = bin_ids >= 0
+    ai, w, bin_ids = ai[in_bin], w[in_bin], bin_ids[in_bin]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        err = np.abs(ai[None, :] * factors[:, None] - w[None, :]) / w[None, :]
+    present = ~np.isnan(err)
+    err = np.where(present, err, 0.0)
+
+    counts = np.zeros((len(factors), n_bins))
+    sums = np.zeros((len(factors), n_bins))
+    for i in range(len(factors)):
+        counts[i] = np.bincount(bin_ids, weights=present[i], minlength=n_bins)
+        sums[i] = np.bincount(bin_ids, weights=err[i], minlength=n_bins)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mae = sums / counts * 100
+    # 계수 순서대로 "더 작으면 갱신"하던 루프처럼 유한 MAE 중 첫 최솟값 선택
+    finite_mae = np.where(np.isfinite(mae), mae, np.inf)
+    best_idx = np.argmin(finite_mae, axis=0)
+    cols = np.arange(n_bins)
+    found = np.isfinite(finite_mae[best_idx, cols])
+    return np.where(found, factors[best_idx], 1.0), np.where(found, mae[best_idx, cols], np.inf)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="AI 추정값 vs 실제 무게 관계 분석",
@@ -35,7 +73,10 @@ def main():
     ai_bins = [0, 0.1, 0.2, 0.3, 0.5, 0.7, 1.0, 1.5, 2.0, 3.0, 5.0, float('inf')]
     ai_labels = ['0-0.1', '0.1-0.2', '0.2-0.3', '0.3-0.5', '0.5-0.7', '0.7-1.0', '1.0-1.5', '1.5-2.0', '2.0-3.0', '3.0-5.0', '5.0+']
     
-    df['ai_bin'] = pd.cut(df['ai_weight'], bins=ai_bins, labels=ai_labels, right=False)
+    # 구간 번호 ([low, high) 기준, 범위 밖/결측은 -1)
+    ai_bin = np.searchsorted(np.array(ai_bins), df['ai_weight'].to_numpy(dtype=np.float64), side='right') - 1
+    ai_bin[ai_bin >= len(ai_labels)] = -1
+    df['ai_bin'] = ai_bin
     
     print("=" * 80)
     print("AI 추정 구간별 실제 무게 분포 분석")
@@ -44,9 +85,17 @@ def main():
     print("-" * 80)
     
     corrections = []
+    factors = np.arange(0.5, 3.0, 0.05)
+    bin_factors, bin_maes = best_factors(
+        df['ai_weight'].to_numpy(dtype=np.float64),
+        df['weight'].to_numpy(dtype=np.float64),
+        ai_bin,
+        len(ai_labels),
+        factors,
+    )
     
-    for label in ai_labels:
-        subset = df[df['ai_bin'] == label]
+    for bin_idx, label in enumerate(ai_labels):
+        subset = df[df['ai_bin'] == bin_idx]
         if len(subset) == 0:
             continue
             
@@ -60,17 +109,12 @@ def main():
         median_ratio = median_actual / median_ai if median_ai > 0 else 1.0
         
         # 최적 보정 계수: MAE를 최소화하는 값 찾기
-        best_factor = 1.0
-        best_mae = float('inf')
-        for factor in np.arange(0.5, 3.0, 0.05):
-            corrected = subset['ai_weight'] * factor
-            mae = (abs(corrected - subset['weight']) / subset['weight'] * 100).mean()
-            if mae < best_mae:
-                best_mae = mae
-                best_factor = factor
+        best_factor = bin_factors[bin_idx]
+        best_mae = bin_maes[bin_idx]
         
         corrections.append({
             'bin': label,
+            'bin_idx': bin_idx,
             'count': len(subset),
             'avg_ai': avg_ai,
             'avg_actual': avg_actual,
@@ -93,7 +137,7 @@ def main():
     # 최적 보정 계수 적용
     df['corrected_weight'] = df['ai_weight'].copy()
     for c in corrections:
-        mask = df['ai_bin'] == c['bin']
+        mask = df['ai_bin'] == c['bin_idx']
         df.loc[mask, 'corrected_weight'] = df.loc[mask, 'ai_weight'] * c['optimal_factor']
     
     corrected_mae = (abs(df['corrected_weight'] - df['weight']) / df['weight'] * 100).mean()
@@ -108,8 +152,8 @@ def main():
     print(f"{'AI구간':<12} {'개수':>6} {'원본MAE':>12} {'보정MAE':>12} {'개선':>10}")
     print("-" * 80)
     
-    for label in ai_labels:
-        subset = df[df['ai_bin'] == label]
+    for bin_idx, label in enumerate(ai_labels):
+        subset = df[df['ai_bin'] == bin_idx]
         if len(subset) == 0:
             continue
         
@@ -125,19 +169,21 @@ def main():
     print("=" * 80)
     
     # 로그 변환 선형 회귀
-    valid = (df['ai_weight'] > 0) & (df['weight'] > 0)
-    log_ai = np.log(df.loc[valid, 'ai_weight'])
-    log_actual = np.log(df.loc[valid, 'weight'])
+    ai = df['ai_weight'].to_numpy(dtype=np.float64)
+    w = df['weight'].to_numpy(dtype=np.float64)
+    valid = (ai > 0) & (w > 0)
+    ai_v = ai[valid]
+    w_v = w[valid]
     
     # 선형 회귀 (log-log space)
-    coeffs = np.polyfit(log_ai, log_actual, 1)
+    coeffs = np.polyfit(np.log(ai_v), np.log(w_v), 1)
     print(f"log(실제) = {coeffs[0]:.4f} * log(AI) + {coeffs[1]:.4f}")
     print(f"즉, 실제 = exp({coeffs[1]:.4f}) * AI^{coeffs[0]:.4f}")
     print(f"     실제 = {np.exp(coeffs[1]):.4f} * AI^{coeffs[0]:.4f}")
     
     # 회귀 기반 보정 적용
-    df.loc[valid, 'regression_corrected'] = np.exp(coeffs[1]) * (df.loc[valid, 'ai_weight'] ** coeffs[0])
-    regression_mae = (abs(df.loc[valid, 'regression_corrected'] - df.loc[valid, 'weight']) / df.loc[valid, 'weight'] * 100).mean()
+    regression_corrected = np.exp(coeffs[1]) * ai_v ** coeffs[0]
+    regression_mae = np.mean(np.abs(regression_corrected - w_v) / w_v) * 100
     print(f"\n회귀 보정 MAE: {regression_mae:.2f}%")
     print(f"원본 대비 개선: {original_mae - regression_mae:.2f}%p")
 
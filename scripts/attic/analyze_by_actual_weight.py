@@ -7,8 +7,9 @@ Usage:
 """
 
 import argparse
-import csv
-from collections import defaultdict
+
+import numpy as np
+import pandas as pd
 
 DEFAULT_INPUT = "inputs/datasource_complete.tsv"
 
@@ -28,43 +29,36 @@ def main():
         (5.0, float('inf'))
     ]
     
-    range_data = defaultdict(list)
+    df = pd.read_csv(args.input, sep="\t", usecols=["actual_weight", "ai_weight_kg"])
+    actual = pd.to_numeric(df["actual_weight"], errors="coerce").to_numpy(dtype=np.float64)
+    ai = pd.to_numeric(df["ai_weight_kg"], errors="coerce").to_numpy(dtype=np.float64)
     
-    with open(args.input, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f, delimiter="\t")
-        
-        for row in reader:
-            try:
-                actual = float(row.get("actual_weight", 0) or 0)
-                ai = float(row.get("ai_weight_kg", 0) or 0)
-                
-                if actual <= 0 or ai <= 0:
-                    continue
-                
-                # Find range based on ACTUAL weight
-                for low, high in weight_ranges:
-                    if low <= actual < high:
-                        range_data[(low, high)].append((actual, ai))
-                        break
-                        
-            except (ValueError, KeyError):
-                continue
+    valid = (actual > 0) & (ai > 0) & np.isfinite(actual)
+    actual, ai = actual[valid], ai[valid]
+    
+    # Find range based on ACTUAL weight ([low, high) edges, one binary search per row)
+    edges = np.array([low for low, _ in weight_ranges] + [weight_ranges[-1][1]])
+    bin_ids = np.searchsorted(edges, actual, side="right") - 1
+    
+    # Per-range sums in one pass each
+    n_bins = len(weight_ranges)
+    counts = np.bincount(bin_ids, minlength=n_bins)
+    sum_actual = np.bincount(bin_ids, weights=actual, minlength=n_bins)
+    sum_ai = np.bincount(bin_ids, weights=ai, minlength=n_bins)
+    sum_error = np.bincount(bin_ids, weights=np.abs(ai - actual) / actual, minlength=n_bins)
     
     print("=== 실제 무게 구간별 AI 추정 분석 ===\n")
     print(f"{'구간':<15} {'개수':>8} {'평균실제':>10} {'평균AI':>10} {'AI/실제':>10} {'MAE':>10}")
     print("-" * 75)
     
-    for (low, high), data in sorted(range_data.items()):
-        if not data:
+    for (low, high), n, s_actual, s_ai, s_error in zip(weight_ranges, counts, sum_actual, sum_ai, sum_error):
+        if not n:
             continue
-            
-        n = len(data)
-        avg_actual = sum(d[0] for d in data) / n
-        avg_ai = sum(d[1] for d in data) / n
-        ratio = avg_ai / avg_actual if avg_actual > 0 else 0
         
-        errors = [abs(d[1] - d[0]) / d[0] for d in data if d[0] > 0]
-        mae = sum(errors) / len(errors) * 100 if errors else 0
+        avg_actual = s_actual / n
+        avg_ai = s_ai / n
+        ratio = avg_ai / avg_actual if avg_actual > 0 else 0
+        mae = s_error / n * 100
         
         range_str = f"{low}-{high}kg" if high != float('inf') else f"{low}kg+"
         print(f"{range_str:<15} {n:>8} {avg_actual:>10.3f} {avg_ai:>10.3f} {ratio:>10.2f} {mae:>9.1f}%")
@@ -11,7 +11,12 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import re
-from collections import Counter
+
+# 불용어
+STOPWORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'is', 'are', 'with', 'for', 'to', 'of', 'in', 'on', 'at', 'it', 'its', 'this', 'that', 'be', 'as', 'by'})
+
+# 단어 토큰 (불용어는 부정 전방탐색으로 처음부터 제외)
+WORD_RE = re.compile(r'\b(?!(?:' + '|'.join(sorted(STOPWORDS)) + r')\b)[a-z]+\b')
 
 
 def main():
@@ -51,8 +56,9 @@ def main():
     print("-" * 90)
     
     keyword_stats = []
+    reasons_lower = df['new_reason'].str.lower()  # 키워드마다 다시 소문자화하지 않도록 한 번만
     for kw in keywords:
-        mask = df['new_reason'].str.lower().str.contains(kw, na=False)
+        mask = reasons_lower.str.contains(kw, regex=False, na=False)
         subset = df[mask]
         if len(subset) < 10:
             continue
@@ -98,18 +104,12 @@ def main():
         
         print(f"\n### {label} (n={len(subset)})")
         
-        # 키워드 빈도
-        word_counter = Counter()
-        for reason in subset['new_reason'].dropna():
-            words = re.findall(r'\b[a-z]+\b', reason.lower())
-            word_counter.update(words)
-        
-        # 불용어 제거
-        stopwords = {'the', 'a', 'an', 'and', 'or', 'is', 'are', 'with', 'for', 'to', 'of', 'in', 'on', 'at', 'it', 'its', 'this', 'that', 'be', 'as', 'by'}
-        for sw in stopwords:
-            word_counter.pop(sw, None)
+        # 키워드 빈도 (구간 전체를 한 번에 토큰화, 불용어 제외, 동률은 처음 등장한 순서 유지)
+        words = subset['new_reason'].dropna().str.lower().str.findall(WORD_RE).explode().dropna()
+        word_counts = words.value_counts(sort=False)
+        top_words = word_counts.sort_values(ascending=False, kind='stable').head(15)
         
-        print("  자주 등장하는 단어:", dict(word_counter.most_common(15)))
+        print("  자주 등장하는 단어:", {w: int(c) for w, c in top_words.items()})
     
     # 과소추정이 심한 케이스 분석
     print("\n\n" + "=" * 90)
@@ -10,17 +10,41 @@ Usage:
 """
 
 import argparse
+import functools
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
 
+# 파싱한 TSV 피클 캐시 위치 (추적되는 inputs/ 옆이 아니라 .local 아래)
+CACHE_DIR = Path(".local/cache/apply_correction_to_categories")
+
 
 def load_correction_config(config_path: str):
     """보정 계수 설정 로드"""
     with open(config_path) as f:
         return json.load(f)
 
+def cached_read_tsv(path) -> pd.DataFrame:
+    """
+    TSV 로드 (파싱 결과를 CACHE_DIR 아래 피클로 캐시)
+
+    캐시가 원본보다 최신이면 TSV를 다시 파싱하지 않고 피클을 읽는다.
+    캐시 파일 이름은 원본 절대 경로의 해시라 입력 디렉토리에는 아무것도 쓰지 않는다.
+    """
+    path = Path(path)
+    key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+    cache_path = CACHE_DIR / f"{path.stem}.{key}.pkl"
+    if cache_path.exists() and cache_path.stat().st_mtime >= path.stat().st_mtime:
+        return pd.read_pickle(cache_path)
+    df = pd.read_csv(path, sep="\t")
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    df.to_pickle(cache_path)
+    return df
+
 def get_correction_factor(ai_weight: float, config: list) -> float:
     """AI 추정 무게에 따른 보정 계수 반환"""
     for c in config:
@@ -30,6 +54,73 @@ def get_correction_factor(ai_weight: float, config: list) -> float:
             return c['factor']
     return 1.0  # 기본값
 
+def build_correction_lut(config: list):
+    """
+    보정 설정을 np.digitize용 (구간 경계, 계수) 배열로 변환
+
+    구간 경계마다 get_correction_factor를 한 번만 평가하므로
+    설정의 빈 구간(기본값 1.0)도 그대로 유지된다.
+    """
+    bounds = {c['min'] for c in config} | {c['max'] for c in config if c['max'] is not None}
+    thresholds = np.array(sorted(bounds), dtype=np.float64)
+    factors = np.array([1.0] + [get_correction_factor(b, config) for b in thresholds])
+    return thresholds, factors
+
+@functools.lru_cache(maxsize=1)
+def _load_correction_lut(config_path: str, mtime: float):
+    return build_correction_lut(load_correction_config(config_path))
+
+def load_correction_lut(config_path: str):
+    """보정 설정 파일을 (구간 경계, 계수) 배열로 로드 (파일 mtime 기준 메모이즈)"""
+    return _load_correction_lut(config_path, os.path.getmtime(config_path))
+
+def calc_mae(estimated: np.ndarray, actual: np.ndarray) -> float:
+    """평균 절대 백분율 오차 (%), 결측값은 제외 (임시 배열 하나로 제자리 계산)"""
+    err = np.subtract(estimated, actual, dtype=np.float64)
+    np.abs(err, out=err)
+    err /= actual
+    return np.nanmean(err) * 100
+
+def find_v5_mae(v5_dirs: list):
+    """가장 최근 v5 결과 폴더의 MAE (%), 없으면 None"""
+    for d in reversed(v5_dirs):
+        # comparison.tsv 또는 merge_result.tsv
+        for fname in ["comparison.tsv", "merge_result.tsv"]:
+            merge_file = d / fname
+            if merge_file.exists():
+                v5_df = pd.read_csv(merge_file, sep="\t")
+                # 컬럼명 확인
+                if 'ai_weight' in v5_df.columns and 'weight' in v5_df.columns:
+                    est, act = v5_df['ai_weight'].to_numpy(), v5_df['weight'].to_numpy()
+                    valid_v5 = act > 0
+                    return calc_mae(est[valid_v5], act[valid_v5])
+                elif 'new_weight_kg' in v5_df.columns and 'actual_weight' in v5_df.columns:
+                    est, act = v5_df['new_weight_kg'].to_numpy(), v5_df['actual_weight'].to_numpy()
+                    valid_v5 = act > 0
+                    return calc_mae(est[valid_v5], act[valid_v5])
+                break
+    return None
+
+def evaluate_category(cat_id: str, subset: pd.DataFrame, thresholds: np.ndarray, factors: np.ndarray, v5_dirs: list) -> dict:
+    """카테고리 하나의 v0 / 보정 / v5 MAE 계산 (프로세스 풀 작업 단위)"""
+    # v0 무게 (old_weight_kg)
+    ai_weight = subset['old_weight_kg'].to_numpy(dtype=np.float64)
+    weight = subset['actual_weight'].to_numpy(dtype=np.float64)
+    
+    # 보정 적용
+    corrected_weight = ai_weight * factors[np.digitize(ai_weight, thresholds)]
+    
+    # MAE 계산
+    valid = weight > 0
+    return {
+        'cat_id': cat_id,
+        'type': "과대" if cat_id.startswith('o') else "과소",
+        'count': len(subset),
+        'v0_mae': calc_mae(ai_weight[valid], weight[valid]),
+        'corrected_mae': calc_mae(corrected_weight[valid], weight[valid]),
+        'v5_mae': find_v5_mae(v5_dirs),
+    }
+
 def main():
     parser = argparse.ArgumentParser(
         description="카테고리별 보정 효과 검증",
@@ -40,7 +131,7 @@ def main():
     parser.add_argument("--v5-base", required=True, help="v5 결과 폴더")
     args = parser.parse_args()
 
-    config = load_correction_config(args.config)
+    thresholds, factors = load_correction_lut(args.config)
     
     # 카테고리 파일들
     categories = {
@@ -60,9 +151,25 @@ def main():
     # v5 결과 폴더
     v5_base = Path(args.v5_base)
     
+    # v5 폴더 목록은 한 번만 스캔하고 카테고리명(`*-{cat_name}`)별로 색인
+    v5_entries = list(v5_base.iterdir()) if v5_base.is_dir() else []
+    v5_index = {
+        name: sorted(p for p in v5_entries if p.name.endswith(f"-{name}"))
+        for name in (Path(f).stem for f in categories.values())
+    }
+    
     # 전체 비교 데이터 (v0 vs new 비교 파일 - v0 정보 포함)
     comparison_file = Path(args.input)
-    full_df = pd.read_csv(comparison_file, sep="\t")
+    full_df = cached_read_tsv(comparison_file)
+    full_df['order_id_str'] = full_df['order_id'].astype(str)
+    
+    # 카테고리별 order_id를 한 프레임으로 모아 한 번의 조인으로 분류
+    cat_ids = pd.concat([
+        cached_read_tsv(cat_file)[['order_id']].astype(str).assign(cat_id=cat_id)
+        for cat_id, cat_file in categories.items()
+    ]).drop_duplicates().rename(columns={'order_id': 'order_id_str'})
+    merged = full_df.merge(cat_ids, on='order_id_str', how='inner')
+    cat_groups = dict(tuple(merged.groupby('cat_id', sort=False)))
     
     print("=" * 110)
     print("카테고리별 보정 효과 검증 (v0 + 보정 vs v5)")
@@ -70,57 +177,25 @@ def main():
     print(f"{'카테고리':<10} {'유형':<6} {'개수':>6} {'v0 MAE':>10} {'보정 MAE':>10} {'개선':>10} {'v5 MAE':>10} {'보정vs v5':>12}")
     print("-" * 110)
     
+    # 카테고리별 계산은 서로 독립이므로 프로세스 풀에서 병렬 처리
+    jobs = {}
+    with ProcessPoolExecutor(max_workers=min(len(categories), os.cpu_count() or 1)) as executor:
+        for cat_id, cat_file in categories.items():
+            subset = cat_groups.get(cat_id)
+            if subset is not None:
+                v5_dirs = v5_index[Path(cat_file).stem]
+                jobs[cat_id] = executor.submit(evaluate_category, cat_id, subset, thresholds, factors, v5_dirs)
+        results = {cat_id: job.result() for cat_id, job in jobs.items()}
+    
     total_results = []
     
-    for cat_id, cat_file in categories.items():
-        # 카테고리 데이터 로드
-        cat_df = pd.read_csv(cat_file, sep="\t")
-        order_ids = set(cat_df['order_id'].astype(str))
-        
-        # 전체 데이터에서 해당 카테고리 추출
-        subset = full_df[full_df['order_id'].astype(str).isin(order_ids)].copy()
-        
-        if len(subset) == 0:
+    for cat_id in categories:
+        if cat_id not in results:
             print(f"{cat_id:<10} 데이터 없음")
             continue
         
-        # v0 무게 (old_weight_kg)
-        subset['ai_weight'] = subset['old_weight_kg']
-        subset['weight'] = subset['actual_weight']
-        
-        # 보정 적용
-        subset['corrected_weight'] = subset['ai_weight'].apply(
-            lambda x: x * get_correction_factor(x, config)
-        )
-        
-        # MAE 계산
-        valid = subset['weight'] > 0
-        v0_mae = (abs(subset.loc[valid, 'ai_weight'] - subset.loc[valid, 'weight']) / subset.loc[valid, 'weight'] * 100).mean()
-        corrected_mae = (abs(subset.loc[valid, 'corrected_weight'] - subset.loc[valid, 'weight']) / subset.loc[valid, 'weight'] * 100).mean()
-        
-        # v5 결과 찾기
-        cat_name = Path(cat_file).stem  # 파일명에서 확장자 제거
-        v5_dirs = sorted(v5_base.glob(f"*-{cat_name}"))
-        
-        v5_mae = None
-        for d in reversed(v5_dirs):
-            # comparison.tsv 또는 merge_result.tsv
-            for fname in ["comparison.tsv", "merge_result.tsv"]:
-                merge_file = d / fname
-                if merge_file.exists():
-                    v5_df = pd.read_csv(merge_file, sep="\t")
-                    # 컬럼명 확인
-                    if 'ai_weight' in v5_df.columns and 'weight' in v5_df.columns:
-                        valid_v5 = v5_df['weight'] > 0
-                        v5_mae = (abs(v5_df.loc[valid_v5, 'ai_weight'] - v5_df.loc[valid_v5, 'weight']) / v5_df.loc[valid_v5, 'weight'] * 100).mean()
-                    elif 'new_weight_kg' in v5_df.columns and 'actual_weight' in v5_df.columns:
-                        valid_v5 = v5_df['actual_weight'] > 0
-                        v5_mae = (abs(v5_df.loc[valid_v5, 'new_weight_kg'] - v5_df.loc[valid_v5, 'actual_weight']) / v5_df.loc[valid_v5, 'actual_weight'] * 100).mean()
-                    break
-            if v5_mae is not None:
-                break
-        
-        cat_type = "과대" if cat_id.startswith('o') else "과소"
+        r = results[cat_id]
+        v0_mae, corrected_mae, v5_mae = r['v0_mae'], r['corrected_mae'], r['v5_mae']
         improvement = v0_mae - corrected_mae
         
         v5_str = f"{v5_mae:.1f}%" if v5_mae else "N/A"
@@ -129,16 +204,9 @@ def main():
             diff = corrected_mae - v5_mae
             vs_v5 = f"{diff:+.1f}%p"
         
-        print(f"{cat_id:<10} {cat_type:<6} {len(subset):>6} {v0_mae:>10.1f}% {corrected_mae:>10.1f}% {improvement:>+10.1f}%p {v5_str:>10} {vs_v5:>12}")
+        print(f"{cat_id:<10} {r['type']:<6} {r['count']:>6} {v0_mae:>10.1f}% {corrected_mae:>10.1f}% {improvement:>+10.1f}%p {v5_str:>10} {vs_v5:>12}")
         
-        total_results.append({
-            'cat_id': cat_id,
-            'type': cat_type,
-            'count': len(subset),
-            'v0_mae': v0_mae,
-            'corrected_mae': corrected_mae,
-            'v5_mae': v5_mae
-        })
+        total_results.append(r)
     
     # 전체 평균
     print("-" * 100)
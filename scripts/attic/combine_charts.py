@@ -20,13 +20,23 @@ Usage:
     uv run python scripts/combine_charts.py \
         -i .local/prompt_results/weight-volume.v2.system \
         -o .local/prompt_results/weight-volume.v2.system/summary
+
+    # Reuse resized charts across reruns (opt-in disk cache)
+    uv run python scripts/combine_charts.py --cache-dir .local/cache/combine_charts
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 from PIL import Image
 
 DEFAULT_INPUT_BASE = ".local/prompt_results/weight-volume.v2.system"
@@ -45,10 +55,53 @@ DEFAULT_CATEGORIES = [
 ]
 
 
+# Lower zlib effort than Pillow's default (6); output stays lossless
+PNG_COMPRESS_LEVEL = 3
+
+
+def fit_width(img: Image.Image, width: int) -> Image.Image:
+    """Scale an image to the given width, keeping its aspect ratio."""
+    if img.width == width:
+        return img
+    height = int(img.height * (width / img.width))
+    # Area averaging is enough when shrinking; keep LANCZOS for upscales
+    resample = Image.Resampling.BOX if width < img.width else Image.Resampling.LANCZOS
+    return img.resize((width, height), resample)
+
+
+@lru_cache(maxsize=None)
+def _load_fitted(path: str, mtime_ns: int, width: int, cache_dir: str | None) -> np.ndarray:
+    """Decode + resize one chart; the resized pixels are kept on disk per (path, mtime, width)."""
+    cache_file = None
+    if cache_dir:
+        key = hashlib.sha1(f"{path}|{mtime_ns}|{width}".encode()).hexdigest()
+        cache_file = Path(cache_dir) / f"{key}.npy"
+        if cache_file.exists():
+            return np.load(cache_file)
+    
+    with Image.open(path) as img:
+        pixels = np.asarray(fit_width(img.convert("RGB"), width))
+    
+    if cache_file:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as f:
+            np.save(f, pixels)
+        os.replace(tmp_file, cache_file)
+    return pixels
+
+
+def load_fitted(path: Path, width: int, cache_dir: str | None = None) -> np.ndarray:
+    """Load an image as an RGB (H, W, 3) array scaled to the given width (memoized, optionally cached on disk)."""
+    resolved = path.resolve()
+    return _load_fitted(str(resolved), resolved.stat().st_mtime_ns, width, cache_dir)
+
+
 def combine_charts(
     input_dir: str,
     output_path: str,
     category_name: str,
+    cache_dir: str | None = None,
 ) -> bool:
     """Combine 4 charts into one image."""
     
@@ -68,71 +121,67 @@ def combine_charts(
             print(f"  Missing: {name} ({path})")
             return False
     
-    # Load images
-    img_comparison = Image.open(files["comparison"])
-    img_scatter = Image.open(files["scatter"])
-    img_line_original = Image.open(files["line_original"])
-    img_line_sorted = Image.open(files["line_sorted"])
-    
-    # Get dimensions
-    # Top row: two square images side by side
-    top_width = img_comparison.width + img_scatter.width
-    top_height = max(img_comparison.height, img_scatter.height)
+    # Widths come from the PNG headers only (Image.open does not decode pixels)
+    widths = {}
+    for name, path in files.items():
+        with Image.open(path) as img:
+            widths[name] = img.width
     
     # Line charts width (should match top row width)
-    line_width = max(top_width, img_line_original.width, img_line_sorted.width)
+    top_width = widths["comparison"] + widths["scatter"]
+    line_width = max(top_width, widths["line_original"], widths["line_sorted"])
     
-    # Resize line charts to match width if needed
-    if img_line_original.width != line_width:
-        ratio = line_width / img_line_original.width
-        new_height = int(img_line_original.height * ratio)
-        img_line_original = img_line_original.resize((line_width, new_height), Image.Resampling.LANCZOS)
-    
-    if img_line_sorted.width != line_width:
-        ratio = line_width / img_line_sorted.width
-        new_height = int(img_line_sorted.height * ratio)
-        img_line_sorted = img_line_sorted.resize((line_width, new_height), Image.Resampling.LANCZOS)
-    
-    # Resize top images to fit half width each
+    # Resize line charts to match width, top images to half width each
+    # (the canvas has no alpha, so resize 3 channels only)
     half_width = line_width // 2
-    
-    # Resize comparison
-    ratio = half_width / img_comparison.width
-    comp_new_height = int(img_comparison.height * ratio)
-    img_comparison = img_comparison.resize((half_width, comp_new_height), Image.Resampling.LANCZOS)
-    
-    # Resize scatter
-    ratio = half_width / img_scatter.width
-    scatter_new_height = int(img_scatter.height * ratio)
-    img_scatter = img_scatter.resize((half_width, scatter_new_height), Image.Resampling.LANCZOS)
+    img_line_original = load_fitted(files["line_original"], line_width, cache_dir)
+    img_line_sorted = load_fitted(files["line_sorted"], line_width, cache_dir)
+    img_comparison = load_fitted(files["comparison"], half_width, cache_dir)
+    img_scatter = load_fitted(files["scatter"], half_width, cache_dir)
     
     # Top row height (use max)
-    top_height = max(img_comparison.height, img_scatter.height)
+    top_height = max(img_comparison.shape[0], img_scatter.shape[0])
+    line_original_bottom = top_height + img_line_original.shape[0]
     
     # Total dimensions
     total_width = line_width
-    total_height = top_height + img_line_original.height + img_line_sorted.height
+    total_height = line_original_bottom + img_line_sorted.shape[0]
     
-    # Create combined image
-    combined = Image.new("RGB", (total_width, total_height), color="white")
+    # Compose into one pre-allocated white canvas by block copies
+    canvas = np.full((total_height, total_width, 3), 255, dtype=np.uint8)
     
-    # Paste images
     # Top row
-    combined.paste(img_comparison, (0, 0))
-    combined.paste(img_scatter, (half_width, 0))
+    canvas[:img_comparison.shape[0], :half_width] = img_comparison
+    canvas[:img_scatter.shape[0], half_width:2 * half_width] = img_scatter
     
     # Line charts
-    combined.paste(img_line_original, (0, top_height))
-    combined.paste(img_line_sorted, (0, top_height + img_line_original.height))
+    canvas[top_height:line_original_bottom] = img_line_original
+    canvas[line_original_bottom:] = img_line_sorted
+    
+    combined = Image.fromarray(canvas)
     
     # Save
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    combined.save(output_path, quality=95)
+    combined.save(output_path, compress_level=PNG_COMPRESS_LEVEL)
     
     print(f"  Saved: {output_path}")
     return True
 
 
+def combine_charts_item(
+    input_dir: str,
+    output_path: str,
+    category_name: str,
+    cache_dir: str | None = None,
+) -> tuple[bool, str]:
+    """Run combine_charts in a worker, returning its result and captured log."""
+    log = io.StringIO()
+    with redirect_stdout(log):
+        print(f"Processing: {category_name}")
+        ok = combine_charts(input_dir, output_path, category_name, cache_dir)
+    return ok, log.getvalue()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Combine chart images into summary"
@@ -146,20 +195,35 @@ def main():
     parser.add_argument("-c", "--categories", nargs="*",
                         default=None,
                         help="Categories to process (default: built-in list)")
+    parser.add_argument("--cache-dir",
+                        default=None,
+                        help="Keep resized charts as .npy files here for reruns "
+                             "(uncompressed, never evicted; default: no disk cache)")
     
     args = parser.parse_args()
     
     # Categories to process
     categories = args.categories if args.categories else DEFAULT_CATEGORIES
     
+    # Categories are independent; combine them in a process pool and
+    # print each worker's log in input order once it finishes
     success = 0
-    for cat in categories:
-        print(f"Processing: {cat}")
-        input_dir = f"{args.input_base}/{cat}"
-        output_path = f"{args.output_dir}/{cat}.png"
-        
-        if combine_charts(input_dir, output_path, cat):
-            success += 1
+    with ProcessPoolExecutor(max_workers=min(len(categories), os.cpu_count() or 1)) as executor:
+        jobs = [
+            executor.submit(
+                combine_charts_item,
+                f"{args.input_base}/{cat}",
+                f"{args.output_dir}/{cat}.png",
+                cat,
+                args.cache_dir,
+            )
+            for cat in categories
+        ]
+        for job in jobs:
+            ok, log = job.result()
+            print(log, end="")
+            if ok:
+                success += 1
     
     print(f"\nDone: {success}/{len(categories)} combined")
 
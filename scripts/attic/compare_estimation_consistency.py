@@ -10,43 +10,48 @@ Usage:
 """
 
 import argparse
-import json
-import matplotlib.pyplot as plt
 import matplotlib
+matplotlib.use('Agg')  # PNG 저장 전용 (GUI 백엔드 탐색 생략)
+import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 from pathlib import Path
 
 matplotlib.rcParams['font.family'] = ['AppleGothic', 'Malgun Gothic', 'sans-serif']
 matplotlib.rcParams['axes.unicode_minus'] = False
 
-def parse_volume(vol_str):
-    """WxDxH 문자열을 파싱하여 (width, depth, height) 반환"""
-    if not vol_str or vol_str == "0":
-        return (0, 0, 0)
-    parts = str(vol_str).lower().split('x')
-    if len(parts) == 3:
-        try:
-            return (float(parts[0]), float(parts[1]), float(parts[2]))
-        except ValueError:
-            return (0, 0, 0)
-    return (0, 0, 0)
+def parse_volume(volumes):
+    """WxDxH 문자열 컬럼을 파싱하여 width/depth/height 컬럼으로 반환 (형식이 틀리면 0)"""
+    volumes = volumes.astype(str).str.lower()
+    parts = volumes.str.split('x', n=2, expand=True).reindex(columns=range(3))
+    dims = parts.apply(pd.to_numeric, errors='coerce')
+    dims.columns = ['width', 'depth', 'height']
+    # 정확히 3개 숫자로 나뉜 값만 사용
+    valid = (volumes.str.count('x') == 2) & dims.notna().all(axis=1)
+    return dims.where(valid, 0.0)
 
 def load_results(filepath):
-    """JSONL 파일에서 결과를 로드하여 id 기준 dict로 반환"""
-    results = {}
-    with open(filepath) as f:
-        for line in f:
-            d = json.loads(line.strip())
-            item_id = d['id']
-            w, dep, h = parse_volume(d.get('volume', '0x0x0'))
-            results[item_id] = {
-                'productName': d.get('productName', ''),
-                'width': w,
-                'depth': dep,
-                'height': h,
-                'weight': d.get('weight', 0),
-            }
-    return results
+    """JSONL 파일을 read_json(lines=True)로 한 번에 읽어 id 인덱스 DataFrame으로 반환"""
+    df = pd.read_json(filepath, lines=True, dtype=False, convert_dates=False)
+    df = df.reindex(columns=['id', 'productName', 'volume', 'weight']).set_index('id')
+    # 같은 id가 여러 번 나오면 마지막 결과 사용 (인덱스가 유일해야 join이 1:1)
+    df = df[~df.index.duplicated(keep='last')]
+
+    # 키가 없거나 null인 값은 기본값으로
+    dims = parse_volume(df['volume'].fillna('0x0x0'))
+    return df[['productName', 'weight']].fillna({'productName': '', 'weight': 0}).join(dims)
+
+def compute_stats(data):
+    """(품목, 날짜, 지표) 배열에서 날짜 축 표준편차와 변동계수(CV, %)를 계산
+
+    평균은 한 번만 구해 표준편차(편차 제곱 평균)와 CV에 함께 사용
+    """
+    means = data.mean(axis=1)
+    dev = data - means[:, np.newaxis, :]
+    sds = np.sqrt((dev * dev).mean(axis=1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cvs = sds / means * 100
+    return sds, cvs
 
 def main():
     parser = argparse.ArgumentParser(
@@ -69,19 +74,25 @@ def main():
         all_data[label] = load_results(filepath)
 
     # 공통 품목 ID 추출 (id 기준 정렬)
-    common_ids = set(all_data[dates[0][1]].keys())
+    common_ids = set(all_data[dates[0][1]].index)
     for label in [d[1] for d in dates]:
-        common_ids &= set(all_data[label].keys())
+        common_ids &= set(all_data[label].index)
     common_ids = sorted(common_ids, key=lambda x: int(x))
 
     print(f"공통 품목 수: {len(common_ids)}")
 
     # 품목명 목록
-    product_names = [all_data[dates[0][1]][pid]['productName'][:20] for pid in common_ids]
+    product_names = all_data[dates[0][1]].loc[common_ids, 'productName'].str[:20].tolist()
 
     metrics = ['width', 'depth', 'height', 'weight']
     metric_labels = ['Width (cm)', 'Depth (cm)', 'Height (cm)', 'Weight (kg)']
 
+    # (품목, 날짜, 지표) 배열로 한 번에 모아 통계는 축 단위로 계산
+    data = np.stack([
+        all_data[label].loc[common_ids, metrics].to_numpy(dtype=np.float64)
+        for _, label in dates
+    ], axis=1)
+
     # 4개 지표 × 1 그래프
     fig, axes = plt.subplots(4, 1, figsize=(20, 24))
     fig.suptitle('추정 일관성 비교 (동일 데이터셋, 4회 반복)', fontsize=16, fontweight='bold')
@@ -93,8 +104,7 @@ def main():
         ax = axes[idx]
 
         for i, (folder, label) in enumerate(dates):
-            values = [all_data[label][pid][metric] for pid in common_ids]
-            ax.bar(x + i * bar_width, values, bar_width,
+            ax.bar(x + i * bar_width, data[:, i, idx], bar_width,
                    label=label, color=colors[i], alpha=0.8)
 
         ax.set_ylabel(metric_label, fontsize=12)
@@ -117,40 +127,27 @@ def main():
     print(f"{'ID':>4} {'품목명':<22} {'Width SD':>10} {'Depth SD':>10} {'Height SD':>10} {'Weight SD':>10}")
     print("-" * 80)
 
-    total_sd = {'width': [], 'depth': [], 'height': [], 'weight': []}
-
-    for pid in common_ids:
-        values = {m: [] for m in metrics}
-        for _, label in dates:
-            for m in metrics:
-                values[m].append(all_data[label][pid][m])
-
-        sds = {m: np.std(values[m]) for m in metrics}
-        name = all_data[dates[0][1]][pid]['productName'][:20]
-
-        for m in metrics:
-            total_sd[m].append(sds[m])
+    sds, cvs = compute_stats(data)
 
-        # 편차가 큰 품목만 출력
-        if any(sds[m] > 0 for m in metrics):
-            print(f"#{pid:>3} {name:<22} {sds['width']:>10.2f} {sds['depth']:>10.2f} {sds['height']:>10.2f} {sds['weight']:>10.3f}")
+    # 편차가 큰 품목만 출력
+    for row in np.flatnonzero((sds > 0).any(axis=1)):
+        pid = common_ids[row]
+        sd_w, sd_d, sd_h, sd_kg = sds[row]
+        print(f"#{pid:>3} {product_names[row]:<22} {sd_w:>10.2f} {sd_d:>10.2f} {sd_h:>10.2f} {sd_kg:>10.3f}")
 
+    mean_sd = sds.mean(axis=0)
     print("-" * 80)
-    print(f"{'평균':>4} {'':22} {np.mean(total_sd['width']):>10.2f} {np.mean(total_sd['depth']):>10.2f} {np.mean(total_sd['height']):>10.2f} {np.mean(total_sd['weight']):>10.3f}")
+    print(f"{'평균':>4} {'':22} {mean_sd[0]:>10.2f} {mean_sd[1]:>10.2f} {mean_sd[2]:>10.2f} {mean_sd[3]:>10.3f}")
 
-    # 일관성 요약
+    # 일관성 요약 (값이 모두 0인 품목은 제외)
     print("\n" + "=" * 80)
     print("일관성 요약")
     print("=" * 80)
-    for m, label in zip(metrics, metric_labels):
-        vals_by_item = []
-        for pid in common_ids:
-            item_vals = [all_data[d[1]][pid][m] for d in dates]
-            if max(item_vals) > 0:
-                cv = np.std(item_vals) / np.mean(item_vals) * 100
-                vals_by_item.append(cv)
-        if vals_by_item:
-            print(f"{label}: 평균 변동계수(CV) = {np.mean(vals_by_item):.1f}%, 최대 CV = {max(vals_by_item):.1f}%")
+    has_value = data.max(axis=1) > 0
+    for idx, label in enumerate(metric_labels):
+        vals_by_item = cvs[has_value[:, idx], idx]
+        if len(vals_by_item):
+            print(f"{label}: 평균 변동계수(CV) = {vals_by_item.mean():.1f}%, 최대 CV = {vals_by_item.max():.1f}%")
 
 if __name__ == "__main__":
     main()
@@ -7,8 +7,9 @@ Usage:
 """
 
 import argparse
-import csv
-from collections import defaultdict
+
+import numpy as np
+import pandas as pd
 
 DEFAULT_INPUT = "inputs/datasource_complete.tsv"
 
@@ -27,28 +28,30 @@ def main():
         (2.0, float('inf'))
     ]
     
-    # Collect data by range
-    range_data = defaultdict(list)
+    # Load weights (rows that fail to parse or are non-positive are skipped)
+    df = pd.read_csv(args.input, sep="\t", usecols=["actual_weight", "ai_weight_kg"])
+    actual = pd.to_numeric(df["actual_weight"], errors="coerce").to_numpy(dtype=np.float64)
+    ai = pd.to_numeric(df["ai_weight_kg"], errors="coerce").to_numpy(dtype=np.float64)
     
-    with open(args.input, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f, delimiter="\t")
-        
-        for row in reader:
-            try:
-                actual = float(row.get("actual_weight", 0) or 0)
-                ai = float(row.get("ai_weight_kg", 0) or 0)
-                
-                if actual <= 0 or ai <= 0:
-                    continue
-                
-                # Find range based on AI estimate
-                for low, high in weight_ranges:
-                    if low <= ai < high:
-                        range_data[(low, high)].append((actual, ai))
-                        break
-                        
-            except (ValueError, KeyError):
-                continue
+    valid = (actual > 0) & (ai > 0) & np.isfinite(ai)
+    actual, ai = actual[valid], ai[valid]
+    
+    # Find range based on AI estimate, then per-range sums in one pass each
+    edges = np.array([low for low, _ in weight_ranges] + [weight_ranges[-1][1]])
+    bin_ids = np.searchsorted(edges, ai, side="right") - 1
+    
+    n_bins = len(weight_ranges)
+    counts = np.bincount(bin_ids, minlength=n_bins)
+    sum_actual = np.bincount(bin_ids, weights=actual, minlength=n_bins)
+    sum_ai = np.bincount(bin_ids, weights=ai, minlength=n_bins)
+    sum_ratio = np.bincount(bin_ids, weights=actual / ai, minlength=n_bins)
+    sum_error = np.bincount(bin_ids, weights=np.abs(ai - actual) / actual, minlength=n_bins)
+    
+    # Optimal factor = average(actual / ai)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        optimal_by_bin = sum_ratio / counts
+    corrected_error = np.abs(ai * optimal_by_bin[bin_ids] - actual) / actual
+    sum_corrected_error = np.bincount(bin_ids, weights=corrected_error, minlength=n_bins)
     
     print("=== AI 추정치 구간별 최적 보정계수 ===\n")
     print(f"{'구간':<15} {'개수':>8} {'평균 실제':>10} {'평균 AI':>10} {'최적계수':>10} {'현재오차':>10} {'보정후오차':>10}")
@@ -56,25 +59,18 @@ def main():
     
     optimal_factors = {}
     
-    for (low, high), data in sorted(range_data.items()):
-        if not data:
+    for b, (low, high) in enumerate(weight_ranges):
+        n = counts[b]
+        if not n:
             continue
-            
-        n = len(data)
-        avg_actual = sum(d[0] for d in data) / n
-        avg_ai = sum(d[1] for d in data) / n
-        
-        # Optimal factor = average(actual / ai)
-        ratios = [d[0] / d[1] for d in data if d[1] > 0]
-        optimal = sum(ratios) / len(ratios) if ratios else 1.0
         
-        # Current error (no correction)
-        current_errors = [abs(d[1] - d[0]) / d[0] for d in data if d[0] > 0]
-        current_mae = sum(current_errors) / len(current_errors) * 100 if current_errors else 0
+        avg_actual = sum_actual[b] / n
+        avg_ai = sum_ai[b] / n
+        optimal = optimal_by_bin[b]
         
-        # Error after correction
-        corrected_errors = [abs(d[1] * optimal - d[0]) / d[0] for d in data if d[0] > 0]
-        corrected_mae = sum(corrected_errors) / len(corrected_errors) * 100 if corrected_errors else 0
+        # Current error (no correction) / error after correction
+        current_mae = sum_error[b] / n * 100
+        corrected_mae = sum_corrected_error[b] / n * 100
         
         range_str = f"{low}-{high}kg" if high != float('inf') else f"{low}kg+"
         print(f"{range_str:<15} {n:>8} {avg_actual:>10.3f} {avg_ai:>10.3f} {optimal:>10.2f} {current_mae:>9.1f}% {corrected_mae:>9.1f}%")
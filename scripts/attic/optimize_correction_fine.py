@@ -15,21 +15,77 @@ from pathlib import Path
 import json
 
 
-def find_optimal_factor(weights_ai, weights_actual, search_range=(0.5, 4.0), step=0.01):
-    """MAE를 최소화하는 보정 계수 찾기"""
-    best_factor = 1.0
-    best_mae = float('inf')
-    
-    for factor in np.arange(search_range[0], search_range[1], step):
-        corrected = weights_ai * factor
-        # 0으로 나누기 방지
-        valid = weights_actual > 0
-        mae = (abs(corrected[valid] - weights_actual[valid]) / weights_actual[valid] * 100).mean()
-        if mae < best_mae:
-            best_mae = mae
-            best_factor = factor
-    
-    return best_factor, best_mae
+def per_bin_factors(weights_ai, weights_actual, edges, search_range=(0.5, 4.0), min_count=10):
+    """
+    구간별 MAE 최소 보정 계수를 한 번에 계산
+
+    MAE(f) = mean(w_i * |f - r_i|) (r_i = 실제/AI, w_i = AI/실제)는 f에 대해 구간별 선형인
+    볼록 함수이므로, 최적값은 r_i의 w_i 가중 중앙값이다 (탐색 범위 밖이면 경계값).
+    (구간, r) 키로 한 번 정렬하면 각 구간이 연속 슬라이스가 되어 선형 스캔으로 중앙값을 찾는다.
+
+    Returns:
+        bin_idx: 행별 구간 번호 (구간 밖이면 -1)
+        counts: 구간별 행 수
+        factors: 구간별 보정 계수 (min_count 미만 구간은 NaN)
+        maes: 구간별 보정 후 MAE
+    """
+    n_bins = len(edges) - 1
+    bin_idx = np.searchsorted(edges, weights_ai, side='right') - 1
+    bin_idx[~(bin_idx < n_bins)] = -1   # NaN/inf 및 범위 밖
+    in_bin = bin_idx >= 0
+    counts = np.bincount(bin_idx[in_bin], minlength=n_bins)
+    
+    # 0으로 나누기 방지
+    valid = in_bin & (weights_actual > 0) & np.isfinite(weights_ai) & np.isfinite(weights_actual)
+    positive = valid & (weights_ai > 0)
+    
+    b = bin_idx[positive]
+    r = weights_actual[positive] / weights_ai[positive]
+    w = weights_ai[positive] / weights_actual[positive]
+    order = np.lexsort((r, b))
+    b, r, w = b[order], r[order], w[order]
+    bounds = np.searchsorted(b, np.arange(n_bins + 1))
+    
+    factors = np.full(n_bins, np.nan)
+    for i in np.flatnonzero(counts >= min_count):
+        start, end = bounds[i], bounds[i + 1]
+        if start == end:
+            factors[i] = 1.0
+            continue
+        cum_w = np.cumsum(w[start:end], dtype=np.float64)
+        k = np.searchsorted(cum_w, 0.5 * cum_w[-1])
+        factors[i] = np.clip(r[start + k], *search_range)
+    
+    b = bin_idx[valid]
+    errors = np.abs(weights_ai[valid] * factors[b] - weights_actual[valid]) / weights_actual[valid] * 100
+    with np.errstate(invalid='ignore', divide='ignore'):
+        maes = np.bincount(b, errors, n_bins) / np.bincount(b, minlength=n_bins)
+    return bin_idx, counts, factors, maes
+
+
+def load_weights(path, chunksize=500_000):
+    """
+    AI 추정/실제 무게 두 컬럼만 청크 단위로 읽기
+
+    가중 중앙값과 백분위는 전체 값이 필요하므로 두 컬럼은 모두 모으되,
+    나머지 컬럼은 파싱 단계에서 버려 최대 메모리를 줄인다.
+    무게는 kg 소수 3자리 수준이므로 float32로 보관한다.
+    """
+    columns = ['old_weight_kg', 'actual_weight']
+    # etl/tsv_to_parquet.py로 변환된 사본은 파싱 없이 한 번에 로드
+    suffix = Path(path).suffix
+    if suffix == '.parquet':
+        chunks = [pd.read_parquet(path, columns=columns)]
+    elif suffix == '.pkl':
+        chunks = [pd.read_pickle(path)[columns]]
+    else:
+        chunks = pd.read_csv(path, sep="\t", usecols=columns, chunksize=chunksize)
+    df = pd.concat(
+        (chunk.apply(pd.to_numeric, errors='coerce').astype(np.float32) for chunk in chunks),
+        ignore_index=True,
+    )
+    return df.rename(columns={'old_weight_kg': 'ai_weight', 'actual_weight': 'weight'})
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -42,16 +98,20 @@ def main():
 
     # 데이터 로드
     comparison_file = Path(args.input)
-    df = pd.read_csv(comparison_file, sep="\t")
+    df = load_weights(comparison_file)
     
-    df['ai_weight'] = df['old_weight_kg']
-    df['weight'] = df['actual_weight']
+    ai = df['ai_weight'].to_numpy()
+    actual = df['weight'].to_numpy()
+    n_rows = len(ai)
+    print(f"총 데이터: {n_rows}개\n")
     
-    print(f"총 데이터: {len(df)}개\n")
+    # 원본 상대오차(%)는 한 번만 계산해 MAE/구간별 MAE/백분위에 재사용
+    with np.errstate(invalid='ignore', divide='ignore'):
+        original_error = (ai - actual) / actual * 100
     
     # 원본 MAE
-    valid = df['weight'] > 0
-    original_mae = (abs(df.loc[valid, 'ai_weight'] - df.loc[valid, 'weight']) / df.loc[valid, 'weight'] * 100).mean()
+    valid = actual > 0
+    original_mae = np.nanmean(np.abs(original_error[valid]))
     print(f"원본 MAE: {original_mae:.2f}%\n")
     
     # 더 세밀한 구간 (20개)
@@ -63,41 +123,38 @@ def main():
     print(f"{'구간':<15} {'개수':>6} {'평균AI':>10} {'평균실제':>10} {'최적계수':>10} {'원본MAE':>10} {'보정MAE':>10}")
     print("-" * 90)
     
-    corrections = {}
-    df['corrected_weight'] = df['ai_weight'].copy()
+    # 경계도 float32로 맞춰야 0.7 같은 값이 아래 구간으로 밀리지 않음
+    edges = np.array(ai_bins, dtype=np.float32)
+    bin_idx, counts, factors, maes = per_bin_factors(ai, actual, edges, search_range=(0.5, 5.0))
+    
+    # 구간별 평균/원본 MAE (NaN 제외)
+    in_bin = bin_idx >= 0
+    def bin_mean(values):
+        ok = in_bin & ~np.isnan(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.bincount(bin_idx[ok], values[ok], len(counts)) / np.bincount(bin_idx[ok], minlength=len(counts))
+    avg_ais = bin_mean(ai)
+    avg_actuals = bin_mean(actual)
+    orig_maes = bin_mean(np.abs(original_error))
     
-    for i in range(len(ai_bins) - 1):
+    corrections = {}
+    for i in np.flatnonzero(~np.isnan(factors)):
         low, high = ai_bins[i], ai_bins[i+1]
         label = f"{low}-{high}" if high != float('inf') else f"{low}+"
-        
-        mask = (df['ai_weight'] >= low) & (df['ai_weight'] < high)
-        subset = df[mask]
-        
-        if len(subset) < 10:
-            # 데이터가 너무 적으면 스킵
-            continue
-        
-        avg_ai = subset['ai_weight'].mean()
-        avg_actual = subset['weight'].mean()
-        
-        # 최적 보정 계수 찾기
-        best_factor, best_mae = find_optimal_factor(
-            subset['ai_weight'].values,
-            subset['weight'].values,
-            search_range=(0.5, 5.0),
-            step=0.01
-        )
-        
-        # 원본 MAE
-        orig_mae = (abs(subset['ai_weight'] - subset['weight']) / subset['weight'] * 100).mean()
-        
+        best_factor = float(factors[i])
         corrections[(low, high)] = best_factor
-        df.loc[mask, 'corrected_weight'] = df.loc[mask, 'ai_weight'] * best_factor
         
-        print(f"{label:<15} {len(subset):>6} {avg_ai:>10.3f} {avg_actual:>10.3f} {best_factor:>10.2f} {orig_mae:>10.1f}% {best_mae:>10.1f}%")
+        print(f"{label:<15} {counts[i]:>6} {avg_ais[i]:>10.3f} {avg_actuals[i]:>10.3f} {best_factor:>10.2f} {orig_maes[i]:>10.1f}% {maes[i]:>10.1f}%")
+    
+    # 데이터가 너무 적어 스킵된 구간은 원본 유지
+    row_factors = np.ones_like(ai)
+    row_factors[in_bin] = np.nan_to_num(factors[bin_idx[in_bin]], nan=1.0)
+    corrected_weight = ai * row_factors
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corrected_error = (corrected_weight - actual) / actual * 100
     
     # 최종 결과
-    corrected_mae = (abs(df.loc[valid, 'corrected_weight'] - df.loc[valid, 'weight']) / df.loc[valid, 'weight'] * 100).mean()
+    corrected_mae = np.nanmean(np.abs(corrected_error[valid]))
     
     print("\n" + "=" * 90)
     print(f"최종 결과")
@@ -125,12 +182,10 @@ def main():
     print("에러 분포 비교")
     print("=" * 90)
     
-    df['original_error'] = (df['ai_weight'] - df['weight']) / df['weight'] * 100
-    df['corrected_error'] = (df['corrected_weight'] - df['weight']) / df['weight'] * 100
-    
-    for percentile in [10, 25, 50, 75, 90]:
-        orig_p = np.percentile(df['original_error'], percentile)
-        corr_p = np.percentile(df['corrected_error'], percentile)
+    percentiles = [10, 25, 50, 75, 90]
+    orig_ps = np.percentile(original_error, percentiles)
+    corr_ps = np.percentile(corrected_error, percentiles)
+    for percentile, orig_p, corr_p in zip(percentiles, orig_ps, corr_ps):
         print(f"P{percentile:02d}: 원본 {orig_p:+.1f}%, 보정 후 {corr_p:+.1f}%")
     
     # 과대/과소 추정 비율
@@ -138,13 +193,15 @@ def main():
     print("과대/과소 추정 비율")
     print("=" * 90)
     
-    orig_over = (df['ai_weight'] > df['weight']).sum()
-    orig_under = (df['ai_weight'] < df['weight']).sum()
-    corr_over = (df['corrected_weight'] > df['weight']).sum()
-    corr_under = (df['corrected_weight'] < df['weight']).sum()
+    # 부호(과소/같음/과대 = 0/1/2)별 건수를 한 번에 집계 (NaN은 '같음'으로)
+    def sign_counts(estimate):
+        signs = np.nan_to_num(np.sign(estimate - actual)).astype(np.int8) + 1
+        return np.bincount(signs, minlength=3)
+    orig_under, _, orig_over = sign_counts(ai)
+    corr_under, _, corr_over = sign_counts(corrected_weight)
     
-    print(f"원본: 과대추정 {orig_over} ({orig_over/len(df)*100:.1f}%), 과소추정 {orig_under} ({orig_under/len(df)*100:.1f}%)")
-    print(f"보정: 과대추정 {corr_over} ({corr_over/len(df)*100:.1f}%), 과소추정 {corr_under} ({corr_under/len(df)*100:.1f}%)")
+    print(f"원본: 과대추정 {orig_over} ({orig_over/n_rows*100:.1f}%), 과소추정 {orig_under} ({orig_under/n_rows*100:.1f}%)")
+    print(f"보정: 과대추정 {corr_over} ({corr_over/n_rows*100:.1f}%), 과소추정 {corr_under} ({corr_under/n_rows*100:.1f}%)")
 
 if __name__ == "__main__":
     main()
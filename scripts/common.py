@@ -5,12 +5,21 @@ Common utilities for OpenAI API scripts.
 from __future__ import annotations
 
 import os
+import re
 import json
+import asyncio
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict, Union
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
 
+try:
+    # Optional faster parser; falls back to the stdlib when not installed
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 
 def get_project_root() -> Path:
     """Get the project root directory by searching for pyproject.toml."""
@@ -32,22 +41,42 @@ def _load_env() -> None:
         load_dotenv(env_path)
 
 
+def _get_api_key() -> str:
+    """Read OPENAI_API_KEY, loading .env first if present."""
+    _load_env()
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable is not set")
+    return api_key
+
+
+@lru_cache(maxsize=1)
 def get_openai_client() -> OpenAI:
     """
     Initialize and return OpenAI client.
     Loads from .env file if present, otherwise uses environment variable.
+    
+    The client is created once per process so every call shares one
+    connection pool (keep-alive instead of a new TLS handshake per client).
     """
-    _load_env()
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable is not set")
-    return OpenAI(api_key=api_key)
+    return OpenAI(api_key=_get_api_key())
 
 
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Initialize and return an async OpenAI client for concurrent calls.
+    Loads from .env file if present, otherwise uses environment variable.
+    """
+    return AsyncOpenAI(api_key=_get_api_key())
+
+
+@lru_cache(maxsize=32)
 def load_prompt_template(filename: str) -> str:
     """
     Load a prompt template from the prompts/ directory.
     
+    Templates are read once per process and then served from memory.
+    
     Args:
         filename: Name of the prompt file (e.g., 'weight-volume.system.txt')
     
@@ -72,15 +101,13 @@ def build_user_content(text: str, image_url: Optional[str] = None) -> List[Dict]
     Returns:
         Content array for OpenAI messages
     """
-    content = [{"type": "text", "text": text}]
-    
     if image_url and image_url.strip():
-        content.append({
-            "type": "image_url",
-            "image_url": {"url": image_url}
-        })
+        return [
+            {"type": "text", "text": text},
+            {"type": "image_url", "image_url": {"url": image_url}},
+        ]
     
-    return content
+    return [{"type": "text", "text": text}]
 
 
 def call_openai_json(
@@ -117,4 +144,93 @@ def call_openai_json(
     if not response_text:
         raise ValueError("No response from OpenAI")
     
-    return json.loads(response_text)
+    return json_loads(response_text)
+
+
+async def call_openai_json_async(
+    client: AsyncOpenAI,
+    system_prompt: str,
+    user_content: Union[List[Dict], str],
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.01,
+) -> Dict:
+    """
+    Async version of call_openai_json; awaits the API call instead of blocking.
+    
+    Args:
+        client: AsyncOpenAI client instance
+        system_prompt: System prompt text
+        user_content: User message content (string or multimodal array)
+        model: Model to use
+        temperature: Temperature for response generation
+    
+    Returns:
+        Parsed JSON response from OpenAI
+    """
+    completion = await client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content},
+        ],
+        response_format={"type": "json_object"},
+        temperature=temperature,
+    )
+    
+    response_text = completion.choices[0].message.content
+    if not response_text:
+        raise ValueError("No response from OpenAI")
+    
+    return json_loads(response_text)
+
+
+async def batch_call_openai_json(
+    client: AsyncOpenAI,
+    system_prompt: str,
+    user_contents: List[Union[List[Dict], str]],
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.01,
+    concurrency: int = 20,
+) -> List[Union[Dict, Exception]]:
+    """
+    Call OpenAI for many user messages concurrently.
+    
+    Args:
+        client: AsyncOpenAI client instance
+        system_prompt: System prompt text shared by all calls
+        user_contents: One user message content per call
+        model: Model to use
+        temperature: Temperature for response generation
+        concurrency: Maximum number of requests in flight
+    
+    Returns:
+        Results in the same order as user_contents; a failed call yields
+        its exception instead of a dict so one error doesn't drop the batch
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def call_one(user_content: Union[List[Dict], str]) -> Dict:
+        async with semaphore:
+            return await call_openai_json_async(
+                client, system_prompt, user_content, model=model, temperature=temperature
+            )
+    
+    return await asyncio.gather(
+        *(call_one(user_content) for user_content in user_contents),
+        return_exceptions=True,
+    )
+
+
+# Runs of spaces, tabs and line breaks; each run becomes a single space in TSV fields
+WHITESPACE_RUN = re.compile(r'[ \t\n\r]+')
+
+
+def sanitize_field(value) -> str:
+    """
+    Sanitize a field value for TSV output.
+    - Replace newlines and tabs with space, collapsing runs of spaces
+    - Convert None to empty string
+    """
+    if value is None:
+        return ''
+    return WHITESPACE_RUN.sub(' ', str(value)).strip()
@@ -15,6 +15,8 @@ AI 추정치는 동일한데 실측치는 다른 경우를 시각화합니다.
 import argparse
 from pathlib import Path
 
+import matplotlib
+matplotlib.use('Agg')  # PNG 저장 전용 (GUI 백엔드 탐색 생략)
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
@@ -31,45 +33,41 @@ def load_data(input_file: str) -> pd.DataFrame:
 
 def analyze_variability(df: pd.DataFrame):
     """상품별 실측치 변동성 분석"""
-    # thumbnail_urls 기준으로 그룹화
-    grouped = df.groupby('thumbnail_urls')
-    
-    results = []
-    for url, group in grouped:
-        if len(group) < 2:
-            continue
-        
-        title = str(group.iloc[0]['title_origin'])[:30]
-        
-        result = {
-            'thumbnail_urls': url,
-            'title': title,
-            'count': len(group),
-            # AI 추정치 (동일해야 함)
-            'ai_weight': group['ai_weight_kg'].iloc[0],
-            'ai_max': group['ai_max'].iloc[0],
-            'ai_mid': group['ai_mid'].iloc[0],
-            'ai_min': group['ai_min'].iloc[0],
-            # 실측치 통계
-            'actual_weight_min': group['actual_weight'].min(),
-            'actual_weight_max': group['actual_weight'].max(),
-            'actual_weight_mean': group['actual_weight'].mean(),
-            'actual_weight_std': group['actual_weight'].std(),
-            'actual_max_min': group['actual_max'].min(),
-            'actual_max_max': group['actual_max'].max(),
-            'actual_mid_min': group['actual_mid'].min(),
-            'actual_mid_max': group['actual_mid'].max(),
-            'actual_min_min': group['actual_min'].min(),
-            'actual_min_max': group['actual_min'].max(),
-        }
-        
-        # 변동 범위 계산
-        result['weight_range'] = result['actual_weight_max'] - result['actual_weight_min']
-        result['weight_range_pct'] = result['weight_range'] / result['actual_weight_mean'] * 100 if result['actual_weight_mean'] > 0 else 0
-        
-        results.append(result)
-    
-    return pd.DataFrame(results)
+    # thumbnail_urls 기준 실측치 통계를 groupby.agg 한 번으로 집계
+    stats = df.groupby('thumbnail_urls').agg(
+        count=('actual_weight', 'size'),
+        # 실측치 통계
+        actual_weight_min=('actual_weight', 'min'),
+        actual_weight_max=('actual_weight', 'max'),
+        actual_weight_mean=('actual_weight', 'mean'),
+        actual_weight_std=('actual_weight', 'std'),
+        actual_max_min=('actual_max', 'min'),
+        actual_max_max=('actual_max', 'max'),
+        actual_mid_min=('actual_mid', 'min'),
+        actual_mid_max=('actual_mid', 'max'),
+        actual_min_min=('actual_min', 'min'),
+        actual_min_max=('actual_min', 'max'),
+    )
+    stats = stats[stats['count'] >= 2]
+    
+    # 상품명/AI 추정치(동일해야 함)는 그룹 첫 행 값 그대로 (NaN 포함, 'first' 집계는 NaN을 건너뜀)
+    first = df.drop_duplicates('thumbnail_urls').set_index('thumbnail_urls').loc[stats.index]
+    
+    result = pd.DataFrame({
+        'title': first['title_origin'].astype(str).str[:30],
+        'count': stats['count'],
+        'ai_weight': first['ai_weight_kg'],
+        'ai_max': first['ai_max'],
+        'ai_mid': first['ai_mid'],
+        'ai_min': first['ai_min'],
+    }).join(stats.drop(columns='count'))
+    
+    # 변동 범위 계산
+    result['weight_range'] = result['actual_weight_max'] - result['actual_weight_min']
+    mean = result['actual_weight_mean']
+    result['weight_range_pct'] = (result['weight_range'] / mean * 100).where(mean > 0, 0)
+    
+    return result.rename_axis('thumbnail_urls').reset_index()
 
 
 def create_visualization(df: pd.DataFrame, variability_df: pd.DataFrame, output_path: str, title: str = None):
@@ -82,6 +80,13 @@ def create_visualization(df: pd.DataFrame, variability_df: pd.DataFrame, output_
         print("시각화할 중복 데이터가 없습니다.")
         return
     
+    # 상위 상품의 실측치를 groupby 한 번으로 URL별 배열로 묶어 둠 (상품마다 전체 재필터링 방지)
+    top_urls = top_products['thumbnail_urls'].tolist()
+    grouped = df[df['thumbnail_urls'].isin(top_urls)].groupby('thumbnail_urls')
+    weight_by_url = grouped['actual_weight'].apply(np.asarray).to_dict()
+    max_by_url = grouped['actual_max'].apply(np.asarray).to_dict()
+    labels = [t[:20] + '...' if len(t) > 20 else t for t in top_products['title']]
+    
     fig, axes = plt.subplots(2, 2, figsize=(16, 14))
     
     # 색상
@@ -92,16 +97,8 @@ def create_visualization(df: pd.DataFrame, variability_df: pd.DataFrame, output_
     
     # 1. 무게 변동성 (boxplot)
     ax1 = axes[0, 0]
-    weight_data = []
-    labels = []
-    ai_weights = []
-    
-    for _, row in top_products.iterrows():
-        url = row['thumbnail_urls']
-        product_data = df[df['thumbnail_urls'] == url]['actual_weight'].values
-        weight_data.append(product_data)
-        labels.append(row['title'][:20] + '...' if len(row['title']) > 20 else row['title'])
-        ai_weights.append(row['ai_weight'])
+    weight_data = [weight_by_url[url] for url in top_urls]
+    ai_weights = top_products['ai_weight'].tolist()
     
     bp = ax1.boxplot(weight_data, vert=True, patch_artist=True)
     for patch in bp['boxes']:
@@ -120,14 +117,8 @@ def create_visualization(df: pd.DataFrame, variability_df: pd.DataFrame, output_
     
     # 2. Max 치수 변동성
     ax2 = axes[0, 1]
-    max_data = []
-    ai_maxs = []
-    
-    for _, row in top_products.iterrows():
-        url = row['thumbnail_urls']
-        product_data = df[df['thumbnail_urls'] == url]['actual_max'].values
-        max_data.append(product_data)
-        ai_maxs.append(row['ai_max'])
+    max_data = [max_by_url[url] for url in top_urls]
+    ai_maxs = top_products['ai_max'].tolist()
     
     bp = ax2.boxplot(max_data, vert=True, patch_artist=True)
     for patch in bp['boxes']:
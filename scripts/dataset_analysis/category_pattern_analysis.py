@@ -24,34 +24,85 @@
 """
 
 import argparse
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from glob import glob
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+COLUMNS = ['ai_weight_kg', 'actual_weight', 'weight_error']
+
+
+def read_table(filepath: str) -> pd.DataFrame:
+    """분석 컬럼만 로드 (etl/tsv_to_parquet.py로 만든 .parquet/.pkl 사본도 지원)"""
+    suffix = Path(filepath).suffix
+    if suffix == '.parquet':
+        return pd.read_parquet(filepath, columns=COLUMNS)
+    if suffix == '.pkl':
+        return pd.read_pickle(filepath)[COLUMNS]
+    return pd.read_csv(filepath, sep='\t', usecols=COLUMNS)
+
+
+def _quantiles(values: np.ndarray, qs) -> list:
+    """선형 보간 분위수 (pandas quantile과 동일), np.partition 한 번으로 계산"""
+    n = len(values)
+    if n == 0:
+        return [np.nan] * len(qs)
+    pos = (n - 1) * np.asarray(qs, dtype=np.float64)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.ceil(pos).astype(np.intp)
+    part = np.partition(values, np.unique(np.concatenate([lo, hi])))
+    return list(part[lo] + (part[hi] - part[lo]) * (pos - lo))
+
 
 def analyze_category(filepath: str) -> dict:
     """단일 카테고리 파일 분석"""
-    df = pd.read_csv(filepath, sep='\t')
+    df = read_table(filepath)
     
     total = len(df)
-    ai_weight = df['ai_weight_kg']
-    actual_weight = df['actual_weight']
-    weight_error = df['weight_error']
+    # 세 컬럼을 한 번에 연속 배열로 변환 후 NumPy로 집계
+    values = df[COLUMNS].to_numpy(dtype=np.float64)
+    ai_all, actual_all, error_all = values.T
+    ai_weight = ai_all[~np.isnan(ai_all)]
+    actual_weight = actual_all[~np.isnan(actual_all)]
+    weight_error = error_all[~np.isnan(error_all)]
     
     # 오차 구간별 건수
-    over_count = (weight_error > 0.5).sum()
-    under_count = (weight_error < -0.5).sum()
-    accurate_count = ((weight_error >= -0.1) & (weight_error <= 0.1)).sum()
+    over_count = np.count_nonzero(weight_error > 0.5)
+    under_count = np.count_nonzero(weight_error < -0.5)
+    accurate_count = np.count_nonzero((weight_error >= -0.1) & (weight_error <= 0.1))
+    
+    # AI 추정값 최빈값 (건수 내림차순, 동률은 먼저 등장한 값 우선)
+    uniq, first_idx, counts = np.unique(ai_weight, return_index=True, return_counts=True)
+    order = np.lexsort((first_idx, -counts))[:5]
+    ai_value_counts = dict(zip(uniq[order].tolist(), counts[order].tolist()))
+    top_ai_value = uniq[order[0]] if len(order) > 0 else None
+    top_ai_pct = counts[order[0]] / total * 100 if len(order) > 0 else 0
     
-    # AI 추정값 최빈값
-    ai_value_counts = ai_weight.value_counts()
-    top_ai_value = ai_value_counts.index[0] if len(ai_value_counts) > 0 else None
-    top_ai_pct = ai_value_counts.iloc[0] / total * 100 if len(ai_value_counts) > 0 else 0
+    # 상관계수 (두 값이 모두 있는 행만, 2행 미만이거나 분산이 0이면 pandas처럼 NaN)
+    pair = ~(np.isnan(ai_all) | np.isnan(actual_all))
+    if np.count_nonzero(pair) >= 2:
+        ai_dev = ai_all[pair] - ai_all[pair].mean()
+        actual_dev = actual_all[pair] - actual_all[pair].mean()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = (ai_dev @ actual_dev) / np.sqrt((ai_dev @ ai_dev) * (actual_dev @ actual_dev))
+    else:
+        corr = np.nan
     
-    # 상관계수
-    corr = ai_weight.corr(actual_weight)
+    # 오차율 평균/표준편차는 합과 제곱합 한 번으로 (표본 표준편차, ddof=1)
+    n_error = len(weight_error)
+    error_sum = weight_error.sum()
+    error_sq_sum = weight_error @ weight_error
+    with np.errstate(invalid='ignore', divide='ignore'):
+        error_mean = error_sum / n_error
+        error_std = np.sqrt(max(error_sq_sum - error_sum * error_mean, 0.0) / (n_error - 1))
+    
+    # 중앙값/사분위는 각 배열에 대해 np.partition 한 번씩
+    error_median, = _quantiles(weight_error, [0.5])
+    actual_q1, actual_median, actual_q3 = _quantiles(actual_weight, [0.25, 0.5, 0.75])
     
     # 패턴 판단
     if over_count > under_count * 2:
@@ -83,20 +134,21 @@ def analyze_category(filepath: str) -> dict:
         'under_pct': under_count / total * 100,
         'accurate_count': accurate_count,
         'accurate_pct': accurate_count / total * 100,
-        'error_mean': weight_error.mean(),
-        'error_median': weight_error.median(),
-        'error_std': weight_error.std(),
+        'error_mean': error_mean,
+        'error_median': error_median,
+        'error_std': error_std,
         'ai_top_value': top_ai_value,
         'ai_top_pct': top_ai_pct,
-        'ai_value_counts': ai_value_counts.head(5),
-        'ai_min': ai_weight.min(),
-        'ai_max': ai_weight.max(),
-        'actual_mean': actual_weight.mean(),
-        'actual_median': actual_weight.median(),
-        'actual_min': actual_weight.min(),
-        'actual_max': actual_weight.max(),
-        'actual_q1': actual_weight.quantile(0.25),
-        'actual_q3': actual_weight.quantile(0.75),
+        'ai_value_counts': ai_value_counts,
+        # 컬럼이 전부 비어 있으면 pandas처럼 NaN (빈 배열의 min/max는 ValueError)
+        'ai_min': ai_weight.min() if ai_weight.size else np.nan,
+        'ai_max': ai_weight.max() if ai_weight.size else np.nan,
+        'actual_mean': actual_weight.mean() if actual_weight.size else np.nan,
+        'actual_median': actual_median,
+        'actual_min': actual_weight.min() if actual_weight.size else np.nan,
+        'actual_max': actual_weight.max() if actual_weight.size else np.nan,
+        'actual_q1': actual_q1,
+        'actual_q3': actual_q3,
         'correlation': corr,
         'error_direction': error_direction,
         'ai_pattern': ai_pattern,
@@ -104,44 +156,63 @@ def analyze_category(filepath: str) -> dict:
     }
 
 
+# 리포트 템플릿 (% 포맷; TOP 5 줄은 사이에 끼워 넣음)
+REPORT_HEAD = """\
+================================================================================
+%(filename)s
+================================================================================
+
+[1] 기본 현황
+    총 건수: %(total)d
+    과대추정(+50%%↑): %(over_count)d (%(over_pct).1f%%)
+    과소추정(-50%%↓): %(under_count)d (%(under_pct).1f%%)
+    정확(-10%%~+10%%): %(accurate_count)d (%(accurate_pct).1f%%)
+
+[2] 오차율 분포
+    평균: %(error_mean_pct)+.1f%%
+    중앙값: %(error_median_pct)+.1f%%
+    표준편차: %(error_std_pct).1f%%
+
+[3] AI 추정값 패턴
+    최빈값 TOP 5:"""
+
+REPORT_TOP_LINE = "      %.1fkg: %d건 (%.1f%%)"
+
+REPORT_TAIL = """\
+    범위: %(ai_min).2fkg ~ %(ai_max).1fkg
+
+[4] 실측값 분포
+    평균: %(actual_mean).2fkg (%(actual_mean_g).0fg)
+    중앙값: %(actual_median).2fkg (%(actual_median_g).0fg)
+    범위: %(actual_min).2fkg ~ %(actual_max).2fkg
+    사분위: Q1=%(actual_q1).2fkg, Q3=%(actual_q3).2fkg
+
+[5] AI-실측 상관계수: %(correlation).3f
+
+[6] 패턴 요약
+    오차 방향: %(error_direction)s
+    AI 패턴: %(ai_pattern)s
+    상관성: %(corr_level)s (%(correlation).2f)"""
+
+SUMMARY_ROW = "%-30s %6d %-12s %-25s %8.2f"
+
+
 def format_report(result: dict) -> str:
     """분석 결과를 텍스트 리포트로 포맷"""
-    lines = []
-    lines.append("=" * 80)
-    lines.append(f"{result['filename']}")
-    lines.append("=" * 80)
-    
-    lines.append(f"\n[1] 기본 현황")
-    lines.append(f"    총 건수: {result['total']}")
-    lines.append(f"    과대추정(+50%↑): {result['over_count']} ({result['over_pct']:.1f}%)")
-    lines.append(f"    과소추정(-50%↓): {result['under_count']} ({result['under_pct']:.1f}%)")
-    lines.append(f"    정확(-10%~+10%): {result['accurate_count']} ({result['accurate_pct']:.1f}%)")
-    
-    lines.append(f"\n[2] 오차율 분포")
-    lines.append(f"    평균: {result['error_mean']*100:+.1f}%")
-    lines.append(f"    중앙값: {result['error_median']*100:+.1f}%")
-    lines.append(f"    표준편차: {result['error_std']*100:.1f}%")
-    
-    lines.append(f"\n[3] AI 추정값 패턴")
-    lines.append(f"    최빈값 TOP 5:")
-    for val, cnt in result['ai_value_counts'].items():
-        lines.append(f"      {val:.1f}kg: {cnt}건 ({cnt/result['total']*100:.1f}%)")
-    lines.append(f"    범위: {result['ai_min']:.2f}kg ~ {result['ai_max']:.1f}kg")
-    
-    lines.append(f"\n[4] 실측값 분포")
-    lines.append(f"    평균: {result['actual_mean']:.2f}kg ({result['actual_mean']*1000:.0f}g)")
-    lines.append(f"    중앙값: {result['actual_median']:.2f}kg ({result['actual_median']*1000:.0f}g)")
-    lines.append(f"    범위: {result['actual_min']:.2f}kg ~ {result['actual_max']:.2f}kg")
-    lines.append(f"    사분위: Q1={result['actual_q1']:.2f}kg, Q3={result['actual_q3']:.2f}kg")
-    
-    lines.append(f"\n[5] AI-실측 상관계수: {result['correlation']:.3f}")
-    
-    lines.append(f"\n[6] 패턴 요약")
-    lines.append(f"    오차 방향: {result['error_direction']}")
-    lines.append(f"    AI 패턴: {result['ai_pattern']}")
-    lines.append(f"    상관성: {result['corr_level']} ({result['correlation']:.2f})")
-    
-    return "\n".join(lines)
+    values = dict(
+        result,
+        error_mean_pct=result['error_mean'] * 100,
+        error_median_pct=result['error_median'] * 100,
+        error_std_pct=result['error_std'] * 100,
+        actual_mean_g=result['actual_mean'] * 1000,
+        actual_median_g=result['actual_median'] * 1000,
+    )
+    total = result['total']
+    top_lines = [
+        REPORT_TOP_LINE % (val, cnt, cnt / total * 100)
+        for val, cnt in result['ai_value_counts'].items()
+    ]
+    return "\n".join([REPORT_HEAD % values, *top_lines, REPORT_TAIL % values])
 
 
 def main():
@@ -174,15 +245,18 @@ def main():
     output_lines.append("카테고리별 오차 패턴 분석")
     output_lines.append("=" * 80)
     
+    # 파일별 분석은 서로 독립이므로 프로세스 풀에서 병렬 처리, 리포트는 입력 순서대로
     results = []
-    for filepath in input_files:
-        try:
-            result = analyze_category(filepath)
-            results.append(result)
-            output_lines.append("")
-            output_lines.append(format_report(result))
-        except Exception as e:
-            output_lines.append(f"\n오류: {filepath} - {e}")
+    with ProcessPoolExecutor(max_workers=min(len(input_files), os.cpu_count() or 1)) as executor:
+        jobs = {filepath: executor.submit(analyze_category, filepath) for filepath in input_files}
+        for filepath, job in jobs.items():
+            try:
+                result = job.result()
+                results.append(result)
+                output_lines.append("")
+                output_lines.append(format_report(result))
+            except Exception as e:
+                output_lines.append(f"\n오류: {filepath} - {e}")
     
     # 요약 테이블
     if len(results) > 1:
@@ -193,10 +267,9 @@ def main():
         output_lines.append(f"\n{'카테고리':<30} {'건수':>6} {'오차방향':<12} {'AI패턴':<25} {'상관계수':>8}")
         output_lines.append("-" * 90)
         for r in results:
-            output_lines.append(
-                f"{r['filename']:<30} {r['total']:>6} {r['error_direction']:<12} "
-                f"{r['ai_pattern']:<25} {r['correlation']:>8.2f}"
-            )
+            output_lines.append(SUMMARY_ROW % (
+                r['filename'], r['total'], r['error_direction'], r['ai_pattern'], r['correlation'],
+            ))
     
     # 출력
     output_text = "\n".join(output_lines)
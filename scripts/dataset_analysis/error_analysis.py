@@ -7,13 +7,30 @@ Converted from colab/05_error_analysis.ipynb for local execution.
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Figures are only saved to PNG; skip GUI backend discovery
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
+from matplotlib import cbook
 import argparse
+from functools import lru_cache
 from pathlib import Path
 
 OUTPUT_DIR = Path('.local/tmp/error_analysis')
 
+# Larger frames are randomly subsampled in the weight-vs-volume scatter
+SCATTER_MAX_POINTS = 20000
+
+# |error| level boundaries: (-inf, 0.1], (0.1, 0.5], (0.5, 1.0], (1.0, inf]
+ERROR_LEVEL_BINS = [-np.inf, 0.1, 0.5, 1.0, np.inf]
+ERROR_LEVELS = ['under_10%', '10%_to_50%', '50%_to_100%', 'over_100%']
+
+
+@lru_cache(maxsize=1)
+def available_font_names() -> frozenset:
+    """Names of fonts known to matplotlib, collected once per process."""
+    return frozenset(f.name for f in fm.fontManager.ttflist)
+
 
 def setup_korean_font():
     """Setup Korean font for matplotlib."""
@@ -25,14 +42,12 @@ def setup_korean_font():
         'Malgun Gothic',
     ]
     
-    available_fonts = [f.name for f in fm.fontManager.ttflist]
-    
-    for font in korean_fonts:
-        if font in available_fonts:
-            plt.rcParams['font.family'] = font
-            plt.rcParams['axes.unicode_minus'] = False
-            print(f"Using font: {font}")
-            return
+    font = next((f for f in korean_fonts if f in available_font_names()), None)
+    if font:
+        plt.rcParams['font.family'] = font
+        plt.rcParams['axes.unicode_minus'] = False
+        print(f"Using font: {font}")
+        return
     
     print("Warning: No Korean font found, characters may not display correctly")
 
@@ -49,7 +64,15 @@ def analyze_error_overview(df: pd.DataFrame):
     print("="*60)
     error_cols = ['weight_error', 'volume_error', 'max_error', 'mid_error', 'min_error', 'avg_dim_error']
     available_cols = [c for c in error_cols if c in df.columns]
-    print(df[available_cols].describe())
+    # Same rows as describe(), with all three quartiles from one quantile() call
+    errors = df[available_cols]
+    quartiles = errors.quantile([0.25, 0.5, 0.75]).rename(index=lambda q: f"{q:.0%}")
+    summary = pd.concat([
+        errors.agg(['count', 'mean', 'std', 'min']),
+        quartiles,
+        errors.agg(['max']),
+    ]).astype(float)
+    print(summary)
 
 
 def analyze_top_volume_errors(df: pd.DataFrame):
@@ -92,13 +115,17 @@ def analyze_top_weight_errors(df: pd.DataFrame):
     top_negative.to_csv(OUTPUT_DIR / 'top200_weight_error_negative.tsv', sep='\t', index=False)
 
 
-def analyze_combined_errors(df: pd.DataFrame):
+def analyze_combined_errors(df: pd.DataFrame, abs_errors: pd.DataFrame):
     print("\n" + "="*60)
     print("TOP 200 COMBINED ERRORS")
     print("="*60)
 
-    df['combined_error'] = (df['weight_error'].abs() + df['volume_error'].abs()) / 2
-    top_combined = df.nlargest(200, 'combined_error')
+    cols = ['product_version_id', 'title_origin', 'category', 'combined_error', 'weight_error',
+            'volume_error', 'thumbnail_urls']
+
+    df['combined_error'] = (abs_errors['weight_error'] + abs_errors['volume_error']) / 2
+    cols = [c for c in cols if c in df.columns]
+    top_combined = df.nlargest(200, 'combined_error')[cols]
     print(f"Combined error range: {top_combined['combined_error'].min():.2%} ~ {top_combined['combined_error'].max():.2%}")
     top_combined.to_csv(OUTPUT_DIR / 'top200_combined_error.tsv', sep='\t', index=False)
 
@@ -108,15 +135,15 @@ def analyze_dimension_twist(df: pd.DataFrame):
     print("DIMENSION TWIST ANALYSIS")
     print("="*60)
 
-    def check_twist(row):
-        actual = [row['actual_max'], row['actual_mid'], row['actual_min']]
-        ai = [row['ai_max'], row['ai_mid'], row['ai_min']]
-        if any(pd.isna(actual)) or any(pd.isna(ai)):
-            return 'unknown'
-        ratios = [ai[i] / actual[i] if actual[i] > 0 else 0 for i in range(3)]
-        return 'twisted' if np.std(ratios) > 0.5 else 'normal'
+    # max/mid/min ratios for all rows at once; a ratio is 0 where the actual dimension is not positive
+    actual = df[['actual_max', 'actual_mid', 'actual_min']].to_numpy(dtype=float)
+    ai = df[['ai_max', 'ai_mid', 'ai_min']].to_numpy(dtype=float)
+    unknown = np.isnan(actual).any(axis=1) | np.isnan(ai).any(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(actual > 0, ai / actual, 0.0)
+    twisted = ratios.std(axis=1) > 0.5
 
-    df['dim_twist'] = df.apply(check_twist, axis=1)
+    df['dim_twist'] = np.where(unknown, 'unknown', np.where(twisted, 'twisted', 'normal'))
     print(df['dim_twist'].value_counts())
 
     twisted = df[df['dim_twist'] == 'twisted']
@@ -124,37 +151,43 @@ def analyze_dimension_twist(df: pd.DataFrame):
     twisted.to_csv(OUTPUT_DIR / 'twisted_dimensions.tsv', sep='\t', index=False)
 
 
+def level_counts(levels: pd.Series) -> pd.Series:
+    """value_counts of an error level column, leaving out levels with no rows."""
+    counts = levels.value_counts()
+    return counts[counts > 0]
+
+
 def analyze_error_distribution(df: pd.DataFrame):
     print("\n" + "="*60)
     print("ERROR DISTRIBUTION")
     print("="*60)
 
-    def categorize(error):
-        abs_err = abs(error)
-        if abs_err > 1.0: return 'over_100%'
-        elif abs_err > 0.5: return '50%_to_100%'
-        elif abs_err > 0.1: return '10%_to_50%'
-        else: return 'under_10%'
+    def categorize(errors: pd.Series) -> pd.Series:
+        # Right-closed bins on |error|; missing errors fall into the lowest level
+        levels = pd.cut(errors.abs(), bins=ERROR_LEVEL_BINS, labels=ERROR_LEVELS)
+        return levels.fillna(ERROR_LEVELS[0])
 
-    df['weight_error_level'] = df['weight_error'].apply(categorize)
-    df['volume_error_level'] = df['volume_error'].apply(categorize)
+    df['weight_error_level'] = categorize(df['weight_error'])
+    df['volume_error_level'] = categorize(df['volume_error'])
 
     print("\nWeight Error Distribution:")
-    print(df['weight_error_level'].value_counts())
+    print(level_counts(df['weight_error_level']))
     print("\nVolume Error Distribution:")
-    print(df['volume_error_level'].value_counts())
+    print(level_counts(df['volume_error_level']))
     return df
 
 
-def analyze_category_stats(df: pd.DataFrame):
+def analyze_category_stats(df: pd.DataFrame, abs_errors: pd.DataFrame):
     print("\n" + "="*60)
     print("CATEGORY STATISTICS")
     print("="*60)
 
-    df['abs_weight_error'] = df['weight_error'].abs()
-    df['abs_volume_error'] = df['volume_error'].abs()
+    df['abs_weight_error'] = abs_errors['weight_error']
+    df['abs_volume_error'] = abs_errors['volume_error']
 
-    stats = df.groupby('category').agg({
+    # Group on categorical codes; cast locally so df['category'] stays plain strings for the later boxplots
+    categories = df['category'].astype('category')
+    stats = df.groupby(categories, observed=True).agg({
         'abs_weight_error': 'mean',
         'abs_volume_error': 'mean',
         'product_version_id': 'count'
@@ -173,30 +206,48 @@ def create_visualizations(df: pd.DataFrame):
     # Setup Korean font
     setup_korean_font()
 
+    # Clipped errors and medians are shared by the histograms and the scatter
+    weight_clip = df['weight_error'].clip(-2, 2).to_numpy()
+    volume_clip = df['volume_error'].clip(-2, 2).to_numpy()
+    weight_median = df['weight_error'].median()
+    volume_median = df['volume_error'].median()
+
     # Figure 1: Error distribution overview
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    # One Figure is reused for both PNGs: cleared and resized between saves
+    fig = plt.figure(figsize=(14, 10))
+    axes = fig.subplots(2, 2)
 
     # Weight error histogram
     ax1 = axes[0, 0]
-    df['weight_error'].clip(-2, 2).hist(bins=50, ax=ax1, color='steelblue', edgecolor='white')
+    ax1.hist(weight_clip[~np.isnan(weight_clip)], bins=50, color='steelblue', edgecolor='white',
+             rasterized=True)
+    ax1.grid(True)
     ax1.axvline(x=0, color='red', linestyle='--')
-    ax1.axvline(x=df['weight_error'].median(), color='green', linestyle='--', label=f"Median: {df['weight_error'].median():.2f}")
+    ax1.axvline(x=weight_median, color='green', linestyle='--', label=f"Median: {weight_median:.2f}")
     ax1.set_title('Weight Error Distribution (clipped ±200%)')
     ax1.set_xlabel('Error')
     ax1.legend()
 
     # Volume error histogram
     ax2 = axes[0, 1]
-    df['volume_error'].clip(-2, 2).hist(bins=50, ax=ax2, color='darkorange', edgecolor='white')
+    ax2.hist(volume_clip[~np.isnan(volume_clip)], bins=50, color='darkorange', edgecolor='white',
+             rasterized=True)
+    ax2.grid(True)
     ax2.axvline(x=0, color='red', linestyle='--')
-    ax2.axvline(x=df['volume_error'].median(), color='green', linestyle='--', label=f"Median: {df['volume_error'].median():.2f}")
+    ax2.axvline(x=volume_median, color='green', linestyle='--', label=f"Median: {volume_median:.2f}")
     ax2.set_title('Volume Error Distribution (clipped ±200%)')
     ax2.set_xlabel('Error')
     ax2.legend()
 
-    # Scatter
+    # Scatter (a fixed-seed subsample keeps large datasets quick to render)
     ax3 = axes[1, 0]
-    ax3.scatter(df['weight_error'].clip(-2, 2), df['volume_error'].clip(-2, 2), alpha=0.3, s=10)
+    if len(weight_clip) > SCATTER_MAX_POINTS:
+        idx = np.sort(np.random.default_rng(0).choice(len(weight_clip), SCATTER_MAX_POINTS, replace=False))
+        ax3.scatter(weight_clip[idx], volume_clip[idx], alpha=0.3, s=10, rasterized=True)
+        ax3.text(0.02, 0.98, f"{SCATTER_MAX_POINTS:,} of {len(weight_clip):,} points",
+                 transform=ax3.transAxes, va='top', fontsize=8, color='gray')
+    else:
+        ax3.scatter(weight_clip, volume_clip, alpha=0.3, s=10, rasterized=True)
     ax3.axhline(y=0, color='red', linestyle='--', linewidth=0.5)
     ax3.axvline(x=0, color='red', linestyle='--', linewidth=0.5)
     ax3.set_title('Weight vs Volume Error')
@@ -206,43 +257,53 @@ def create_visualizations(df: pd.DataFrame):
     # Pie chart
     ax4 = axes[1, 1]
     if 'volume_error_level' in df.columns:
-        counts = df['volume_error_level'].value_counts()
+        counts = level_counts(df['volume_error_level'])
         ax4.pie(counts.values, labels=counts.index, autopct='%1.1f%%')
         ax4.set_title('Volume Error Level')
 
-    plt.tight_layout()
-    plt.savefig(OUTPUT_DIR / 'error_distribution.png', dpi=150)
+    # Histogram/scatter panels are point-heavy; 100 dpi is plenty for them
+    fig.tight_layout()
+    fig.savefig(OUTPUT_DIR / 'error_distribution.png', dpi=100)
     print(f"Saved: {OUTPUT_DIR / 'error_distribution.png'}")
 
     # Figure 2: Error by category bar chart
-    fig2, axes2 = plt.subplots(1, 2, figsize=(14, 6))
+    fig.clear()
+    fig.set_size_inches(14, 6)
+    axes2 = fig.subplots(1, 2)
 
     top_cats = df['category'].value_counts().head(10).index
     df_top = df[df['category'].isin(top_cats)]
 
     if len(df_top) > 0:
-        # Weight error by category
-        ax1 = axes2[0]
-        df_top.boxplot(column='weight_error', by='category', ax=ax1)
-        ax1.set_title('Weight Error by Category (Top 10)')
-        ax1.set_xlabel('Category')
-        ax1.set_ylabel('Weight Error')
-        ax1.set_ylim(-2, 2)
-        plt.suptitle('')
-        ax1.tick_params(axis='x', rotation=45)
-
-        # Volume error by category
-        ax2 = axes2[1]
-        df_top.boxplot(column='volume_error', by='category', ax=ax2)
-        ax2.set_title('Volume Error by Category (Top 10)')
-        ax2.set_xlabel('Category')
-        ax2.set_ylabel('Volume Error')
-        ax2.set_ylim(-2, 2)
-        plt.suptitle('')
-        ax2.tick_params(axis='x', rotation=45)
-
-    plt.tight_layout()
-    plt.savefig(OUTPUT_DIR / 'error_by_category.png', dpi=150)
+        # One groupby feeds both panels; box stats (1.5 IQR whiskers) go straight to ax.bxp
+        grouped = df_top.groupby('category')
+        # Same greys the previous df.boxplot output used
+        box_style = dict(
+            boxprops=dict(color='0.12'),
+            whiskerprops=dict(color='0.12'),
+            capprops=dict(color='k'),
+            medianprops=dict(color='0.71'),
+        )
+        panels = [
+            (axes2[0], 'weight_error', 'Weight Error by Category (Top 10)', 'Weight Error'),
+            (axes2[1], 'volume_error', 'Volume Error by Category (Top 10)', 'Volume Error'),
+        ]
+        for ax, col, title, ylabel in panels:
+            stats = [
+                cbook.boxplot_stats(values.dropna().to_numpy(), labels=[category])[0]
+                for category, values in grouped[col]
+            ]
+            ax.bxp(stats, **box_style)
+            ax.grid(True)
+            ax.set_title(title)
+            ax.set_xlabel('Category')
+            ax.set_ylabel(ylabel)
+            ax.set_ylim(-2, 2)
+            ax.tick_params(axis='x', rotation=45)
+
+    fig.tight_layout()
+    fig.savefig(OUTPUT_DIR / 'error_by_category.png', dpi=150)
+    plt.close(fig)
     print(f"Saved: {OUTPUT_DIR / 'error_by_category.png'}")
 
 
@@ -258,10 +319,14 @@ def main():
     analyze_error_overview(df)
     analyze_top_volume_errors(df)
     analyze_top_weight_errors(df)
-    analyze_combined_errors(df)
+
+    # |error| is shared by the combined ranking and the category stats; kept out of df
+    # until the category step so the TSVs written in between keep their columns
+    abs_errors = df[['weight_error', 'volume_error']].abs()
+    analyze_combined_errors(df, abs_errors)
     analyze_dimension_twist(df)
     df = analyze_error_distribution(df)
-    analyze_category_stats(df)
+    analyze_category_stats(df, abs_errors)
 
     if not args.no_viz:
         create_visualizations(df)
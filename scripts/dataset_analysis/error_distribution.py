@@ -27,8 +27,10 @@ AI 추정값과 실측값 간의 오차를 구간별로 분석하고 시각화
 
 import argparse
 import json
+import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -36,9 +38,19 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 
+try:
+    # pyarrow가 있으면 멀티스레드 Arrow CSV 리더 사용, 없으면 pandas C 파서
+    import pyarrow  # noqa: F401
+    CSV_OPTIONS = {'engine': 'pyarrow'}
+except ImportError:
+    CSV_OPTIONS = {'low_memory': False}
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from common import PROJECT_ROOT
 
+# 분석 디렉토리 이름의 serial (예: vw-001-datasource, baseline-002-...)
+SERIAL_PATTERN = re.compile(r"(?:[\w]+-)?(\d{3})-")
+
 
 def get_dataset_analysis_dir() -> Path:
     """Get dataset analysis output directory."""
@@ -51,14 +63,15 @@ def get_next_serial(analysis_dir: Path) -> int:
         return 1
     
     max_serial = 0
-    pattern = re.compile(r"(?:[\w]+-)?(\d{3})-")
     
-    for item in analysis_dir.iterdir():
-        if item.is_dir():
-            match = pattern.match(item.name)
-            if match:
-                serial = int(match.group(1))
-                max_serial = max(max_serial, serial)
+    # scandir 항목은 이름/타입을 바로 제공하므로 항목별 stat 호출이 없음
+    with os.scandir(analysis_dir) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                match = SERIAL_PATTERN.match(entry.name)
+                if match:
+                    serial = int(match.group(1))
+                    max_serial = max(max_serial, serial)
     
     return max_serial + 1
 
@@ -125,6 +138,26 @@ ERROR_BINS = [
     (1.0, float('inf'), '> +100%'),
 ]
 
+# 구간 경계 (각 구간은 [low, high)); searchsorted 결과가 곧 구간 번호
+ERROR_EDGES = np.array([low for low, _, _ in ERROR_BINS[1:]])
+
+# 구간 라벨 (간략화)
+BIN_LABELS = [label for _, _, label in ERROR_BINS]
+
+ERROR_COLORS = {
+    'negative': '#e74c3c',  # 빨강 (과소추정)
+    'zero': '#2ecc71',      # 초록 (정확)
+    'positive': '#3498db',  # 파랑 (과대추정)
+}
+
+# 막대 색상: 과소추정(빨강), 정확(초록, -10%~+10%), 과대추정(파랑); 구간에만 의존하므로 한 번만 계산
+BAR_COLORS = [
+    ERROR_COLORS['zero'] if low >= -0.1 and high <= 0.1
+    else ERROR_COLORS['negative'] if high <= 0
+    else ERROR_COLORS['positive']
+    for low, high, _ in ERROR_BINS
+]
+
 # 분석 대상 컬럼
 ERROR_COLUMNS = [
     ('max_dim_error', 'Max Dim (최대 치수)'),
@@ -137,50 +170,65 @@ ERROR_COLUMNS = [
 
 def load_data(input_file: str) -> pd.DataFrame:
     """데이터 로드 및 오차 컬럼 계산"""
-    df = pd.read_csv(input_file, sep='\t', low_memory=False)
-    
-    # 숫자 컬럼 변환 (문자열로 읽힐 수 있음)
+    # 분석에 쓰는 숫자 컬럼만 로드 (상품명/URL 등 문자열 컬럼은 파싱하지 않음)
     numeric_cols = ['ai_max', 'ai_mid', 'ai_min', 'actual_max', 'actual_mid', 'actual_min',
                     'weight_error', 'volume_error']
+    # pyarrow 엔진은 callable usecols/없는 컬럼명을 받지 않으므로 헤더에서 실제 컬럼 목록을 만듦
+    header = pd.read_csv(input_file, sep='\t', nrows=0).columns
+    usecols = [c for c in header if c in numeric_cols]
+    df = pd.read_csv(input_file, sep='\t', usecols=usecols, **CSV_OPTIONS)
+    
+    # 숫자 컬럼 변환 (문자열로 읽힐 수 있음)
     for col in numeric_cols:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce')
     
-    # 치수 오차 계산: (AI - Actual) / Actual
-    df['max_dim_error'] = (df['ai_max'] - df['actual_max']) / df['actual_max']
-    df['mid_dim_error'] = (df['ai_mid'] - df['actual_mid']) / df['actual_mid']
-    df['min_dim_error'] = (df['ai_min'] - df['actual_min']) / df['actual_min']
+    # 치수 오차 계산: (AI - Actual) / Actual, 세 치수를 (N, 3) 배열 하나로 계산
+    # (float64 유지, 실측 0은 기존처럼 inf/NaN)
+    ai = df[['ai_max', 'ai_mid', 'ai_min']].to_numpy(dtype=np.float64)
+    actual = df[['actual_max', 'actual_mid', 'actual_min']].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ai -= actual
+        ai /= actual
+    df[['max_dim_error', 'mid_dim_error', 'min_dim_error']] = ai
     
     return df
 
 
 def get_distribution(series: pd.Series) -> tuple:
     """오차 시리즈의 구간별 분포 계산"""
-    valid = series.dropna()
+    valid = series.dropna().to_numpy(dtype=np.float64)
     total = len(valid)
     
+    # 한 번의 이진 탐색으로 모든 값의 구간 번호를 구한 뒤 bincount로 집계
+    bin_idx = np.searchsorted(ERROR_EDGES, valid, side='right')
+    counts = np.bincount(bin_idx, minlength=len(ERROR_BINS))
+    
     results = []
-    for low, high, label in ERROR_BINS:
-        if low == -float('inf'):
-            count = int((valid < high).sum())
-        elif high == float('inf'):
-            count = int((valid >= low).sum())
-        else:
-            count = int(((valid >= low) & (valid < high)).sum())
+    for (_, _, label), count in zip(ERROR_BINS, counts.tolist()):
         pct = count / total * 100 if total > 0 else 0
         results.append((label, count, pct))
     
-    stats = {
-        'total': total,
-        'mean': float(valid.mean()),
-        'median': float(valid.median()),
-        'std': float(valid.std()),
-    }
+    with np.errstate(invalid='ignore'):
+        stats = {
+            'total': total,
+            'mean': float(valid.mean()) if total > 0 else np.nan,
+            'median': float(np.median(valid)) if total > 0 else np.nan,
+            'std': float(valid.std(ddof=1)) if total > 1 else np.nan,
+        }
     
     return results, stats
 
 
-def print_distribution(df: pd.DataFrame, output_file: str = None):
+def compute_distributions(df: pd.DataFrame) -> dict:
+    """분석 대상 컬럼별 (구간 분포, 통계)를 한 번씩만 계산"""
+    # 컬럼별 계산은 서로 독립이고 NumPy 정렬/집계는 GIL을 풀어주므로 스레드 풀로 병렬 처리
+    cols = [col for col, _ in ERROR_COLUMNS]
+    with ThreadPoolExecutor(max_workers=len(cols)) as executor:
+        return dict(zip(cols, executor.map(lambda col: get_distribution(df[col]), cols)))
+
+
+def print_distribution(df: pd.DataFrame, distributions: dict, output_file: str = None):
     """콘솔에 분포 테이블 출력 및 파일 저장"""
     lines = []
     
@@ -188,7 +236,7 @@ def print_distribution(df: pd.DataFrame, output_file: str = None):
     lines.append("")
     
     for col, name in ERROR_COLUMNS:
-        dist, stats = get_distribution(df[col])
+        dist, stats = distributions[col]
         
         lines.append('=' * 60)
         lines.append(f'{name} 오차 분포')
@@ -217,44 +265,25 @@ def print_distribution(df: pd.DataFrame, output_file: str = None):
         print(f"분포 테이블 저장 완료: {output_file}")
 
 
-def create_visualization(df: pd.DataFrame, output_path: str, title: str = None):
+def create_visualization(df: pd.DataFrame, distributions: dict, output_path: str, title: str = None):
     """오차 분포 시각화 이미지 생성"""
     fig, axes = plt.subplots(2, 3, figsize=(18, 12))
     axes = axes.flatten()
     
-    # 구간 라벨 (간략화)
-    bin_labels = [b[2] for b in ERROR_BINS]
-    
-    colors = {
-        'negative': '#e74c3c',  # 빨강 (과소추정)
-        'zero': '#2ecc71',      # 초록 (정확)
-        'positive': '#3498db',  # 파랑 (과대추정)
-    }
-    
     for idx, (col, name) in enumerate(ERROR_COLUMNS):
         ax = axes[idx]
-        dist, stats = get_distribution(df[col])
+        dist, stats = distributions[col]
         
         percentages = [d[2] for d in dist]
         
-        # 색상 지정: 과소추정(빨강), 정확(초록, -10%~+10%), 과대추정(파랑)
-        bar_colors = []
-        for i, (low, high, _) in enumerate(ERROR_BINS):
-            if low >= -0.1 and high <= 0.1:
-                bar_colors.append(colors['zero'])
-            elif high <= 0:
-                bar_colors.append(colors['negative'])
-            else:
-                bar_colors.append(colors['positive'])
-        
-        bars = ax.bar(range(len(bin_labels)), percentages, color=bar_colors, edgecolor='white', linewidth=0.5)
+        bars = ax.bar(range(len(BIN_LABELS)), percentages, color=BAR_COLORS, edgecolor='white', linewidth=0.5)
         
         ax.set_title(f'{name}\n평균: {stats["mean"]:.1%} | 중앙값: {stats["median"]:.1%}', 
                      fontsize=12, fontweight='bold')
         ax.set_xlabel('오차 구간')
         ax.set_ylabel('비율 (%)')
-        ax.set_xticks(range(len(bin_labels)))
-        ax.set_xticklabels(bin_labels, rotation=45, ha='right', fontsize=8)
+        ax.set_xticks(range(len(BIN_LABELS)))
+        ax.set_xticklabels(BIN_LABELS, rotation=45, ha='right', fontsize=8)
         ax.set_ylim(0, max(percentages) * 1.1 if percentages else 10)
         
         # 그리드
@@ -264,9 +293,9 @@ def create_visualization(df: pd.DataFrame, output_path: str, title: str = None):
     # 마지막 subplot에 범례 추가
     axes[5].axis('off')
     legend_elements = [
-        plt.Rectangle((0, 0), 1, 1, facecolor=colors['negative'], label='과소추정 (AI < 실측)'),
-        plt.Rectangle((0, 0), 1, 1, facecolor=colors['zero'], label='정확 (-10% ~ +10%)'),
-        plt.Rectangle((0, 0), 1, 1, facecolor=colors['positive'], label='과대추정 (AI > 실측)'),
+        plt.Rectangle((0, 0), 1, 1, facecolor=ERROR_COLORS['negative'], label='과소추정 (AI < 실측)'),
+        plt.Rectangle((0, 0), 1, 1, facecolor=ERROR_COLORS['zero'], label='정확 (-10% ~ +10%)'),
+        plt.Rectangle((0, 0), 1, 1, facecolor=ERROR_COLORS['positive'], label='과대추정 (AI > 실측)'),
     ]
     axes[5].legend(handles=legend_elements, loc='center', fontsize=14)
     
@@ -295,11 +324,11 @@ def create_visualization(df: pd.DataFrame, output_path: str, title: str = None):
     print(f"시각화 저장 완료: {output_path}")
 
 
-def create_summary_table(df: pd.DataFrame, output_path: str):
+def create_summary_table(distributions: dict, output_path: str):
     """요약 테이블 CSV 저장"""
     rows = []
     for col, name in ERROR_COLUMNS:
-        dist, stats = get_distribution(df[col])
+        dist, stats = distributions[col]
         
         row = {
             '지표': name,
@@ -356,14 +385,17 @@ def main():
     # 메타 정보 저장
     save_meta(output_dir, input_file, analysis_id)
     
+    # 컬럼별 분포는 한 번만 계산해 출력/시각화/요약에 공유
+    distributions = compute_distributions(df)
+    
     # 콘솔 출력 및 텍스트 파일 저장
-    print_distribution(df, output_dir / 'error_distribution.txt')
+    print_distribution(df, distributions, output_dir / 'error_distribution.txt')
     
     # 시각화 저장
-    create_visualization(df, output_dir / 'error_distribution.png', chart_title)
+    create_visualization(df, distributions, output_dir / 'error_distribution.png', chart_title)
     
     # 요약 테이블 저장
-    create_summary_table(df, output_dir / 'error_distribution_summary.csv')
+    create_summary_table(distributions, output_dir / 'error_distribution_summary.csv')
     
     print(f"\n다음 단계:")
     print(f"  결과 확인: open {output_dir}")
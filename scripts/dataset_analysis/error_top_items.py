@@ -28,13 +28,20 @@ from pathlib import Path
 
 import pandas as pd
 
+try:
+    # pyarrow가 있으면 멀티스레드 Arrow CSV 리더 사용, 없으면 pandas C 파서
+    import pyarrow  # noqa: F401
+    CSV_OPTIONS = {'engine': 'pyarrow'}
+except ImportError:
+    CSV_OPTIONS = {'low_memory': False}
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from common import PROJECT_ROOT
 
 
 def load_data(input_file: str) -> pd.DataFrame:
     """데이터 로드"""
-    df = pd.read_csv(input_file, sep='\t', low_memory=False)
+    df = pd.read_csv(input_file, sep='\t', **CSV_OPTIONS)
     
     # 숫자 컬럼 변환
     numeric_cols = ['weight_error', 'volume_error', 'ai_weight_kg', 'actual_weight']
@@ -89,16 +96,15 @@ def extract_top_items(df: pd.DataFrame, top_n: int, error_type: str = 'over') ->
         TOP N 항목 데이터프레임
     """
     # weight_error가 있는 행만 필터링
-    valid_df = df[df['weight_error'].notna()].copy()
+    valid_df = df[df['weight_error'].notna()]
     
+    # 전체 정렬 대신 nlargest/nsmallest로 상위 N개만 선택 (O(N), 동률은 먼저 나온 행 우선)
     if error_type == 'over':
         # 과대추정: 오차가 큰 순 (양수 방향)
-        sorted_df = valid_df.sort_values('weight_error', ascending=False)
+        return valid_df.nlargest(top_n, 'weight_error')
     else:
         # 과소추정: 오차가 작은 순 (음수 방향)
-        sorted_df = valid_df.sort_values('weight_error', ascending=True)
-    
-    return sorted_df.head(top_n)
+        return valid_df.nsmallest(top_n, 'weight_error')
 
 
 def print_top_items_table(df: pd.DataFrame, title: str, output_file: str = None):
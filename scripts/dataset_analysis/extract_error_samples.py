@@ -28,20 +28,17 @@ def extract_samples(filepath: str, error_type: str, n: int) -> pd.DataFrame:
     """오차 상위 N개 샘플 추출"""
     df = pd.read_csv(filepath, sep='\t')
     
+    # 전체 정렬 대신 nlargest/nsmallest로 상위 N개만 선택 (O(N), 동률은 먼저 나온 행 우선)
     if error_type == 'over':
         # 과대추정: 양수 오차 중 가장 큰 것
-        filtered = df[df['weight_error'] > 0].copy()
-        filtered = filtered.sort_values('weight_error', ascending=False)
+        return df[df['weight_error'] > 0].nlargest(n, 'weight_error')
     elif error_type == 'under':
         # 과소추정: 음수 오차 중 가장 작은 것 (절대값 큰 것)
-        filtered = df[df['weight_error'] < 0].copy()
-        filtered = filtered.sort_values('weight_error', ascending=True)
+        return df[df['weight_error'] < 0].nsmallest(n, 'weight_error')
     else:  # both
         # 양방향: 절대값 기준
         df['abs_error'] = df['weight_error'].abs()
-        filtered = df.sort_values('abs_error', ascending=False)
-    
-    return filtered.head(n)
+        return df.nlargest(n, 'abs_error')
 
 
 def format_output(samples: pd.DataFrame, error_type: str) -> str:
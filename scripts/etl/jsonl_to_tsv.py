@@ -10,11 +10,12 @@ import json
 import csv
 import shutil
 import sys
+from collections.abc import Iterator
 from pathlib import Path
 from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from common import PROJECT_ROOT
+from common import PROJECT_ROOT, sanitize_field
 
 
 def read_existing_tsv_header(tsv_path: Path) -> list[str]:
@@ -25,40 +26,13 @@ def read_existing_tsv_header(tsv_path: Path) -> list[str]:
     return header
 
 
-def read_jsonl(jsonl_path: Path) -> list[dict]:
-    """Read all records from JSONL file."""
-    records = []
+def iter_jsonl(jsonl_path: Path) -> Iterator[dict]:
+    """Yield records from a JSONL file one at a time."""
     with open(jsonl_path, 'r', encoding='utf-8') as f:
         for line in f:
             line = line.strip()
             if line:
-                records.append(json.loads(line))
-    return records
-
-
-def sanitize_field(value) -> str:
-    """
-    Sanitize a field value for TSV output.
-    - Replace newlines with space
-    - Replace tabs with space
-    - Convert None to empty string
-    """
-    if value is None:
-        return ''
-
-    # Convert to string
-    text = str(value)
-
-    # Replace problematic characters
-    text = text.replace('\n', ' ')
-    text = text.replace('\r', ' ')
-    text = text.replace('\t', ' ')
-
-    # Collapse multiple spaces into one
-    while '  ' in text:
-        text = text.replace('  ', ' ')
-
-    return text.strip()
+                yield json.loads(line)
 
 
 def convert_jsonl_to_tsv(
@@ -87,12 +61,6 @@ def convert_jsonl_to_tsv(
     print(f"  Found {len(columns)} columns")
     print(f"  Columns: {columns[:5]}... (showing first 5)")
 
-    # Read JSONL records
-    print(f"\nReading JSONL from: {jsonl_path}")
-    records = read_jsonl(jsonl_path)
-    stats['source_records'] = len(records)
-    print(f"  Found {len(records):,} records")
-
     # Backup existing TSV
     if backup and tsv_path.exists():
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -102,24 +70,34 @@ def convert_jsonl_to_tsv(
         stats['backup_path'] = str(backup_path)
         print(f"\n  Backup created: {backup_path}")
 
-    # Write new TSV
-    print(f"\nWriting clean TSV to: {tsv_path}")
-    with open(tsv_path, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f, delimiter='\t', quoting=csv.QUOTE_MINIMAL)
-
-        # Write header
-        writer.writerow(columns)
-
-        # Write records
-        for record in records:
-            row = []
-            for col in columns:
-                value = record.get(col)
-                sanitized = sanitize_field(value)
-                row.append(sanitized)
-            writer.writerow(row)
-            stats['output_records'] += 1
-
+    # Stream JSONL records straight into the new TSV (one pass, no record list).
+    # Rows go to a .part file first so a bad line cannot leave a truncated TSV;
+    # on any failure the .part file is removed.
+    print(f"\nReading JSONL from: {jsonl_path}")
+    print(f"Writing clean TSV to: {tsv_path}")
+    part_path = tsv_path.with_name(tsv_path.name + '.part')
+    try:
+        with open(part_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, delimiter='\t', quoting=csv.QUOTE_MINIMAL)
+
+            # Write header
+            writer.writerow(columns)
+
+            # Write records (hot loop: bind the per-cell callables to locals)
+            columns = tuple(columns)
+            sanitize = sanitize_field
+            writerow = writer.writerow
+            for record in iter_jsonl(jsonl_path):
+                stats['source_records'] += 1
+                get = record.get
+                writerow([sanitize(get(col)) for col in columns])
+                stats['output_records'] += 1
+        part_path.replace(tsv_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+    print(f"  Found {stats['source_records']:,} records")
     print(f"  Wrote {stats['output_records']:,} records")
 
     return stats
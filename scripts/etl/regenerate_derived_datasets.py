@@ -23,7 +23,7 @@ from collections import defaultdict
 from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from common import PROJECT_ROOT
+from common import PROJECT_ROOT, sanitize_field
 
 
 def read_jsonl(jsonl_path: Path) -> list[dict]:
@@ -37,19 +37,6 @@ def read_jsonl(jsonl_path: Path) -> list[dict]:
     return records
 
 
-def sanitize_field(value) -> str:
-    """Sanitize a field value for TSV output."""
-    if value is None:
-        return ''
-    text = str(value)
-    text = text.replace('\n', ' ')
-    text = text.replace('\r', ' ')
-    text = text.replace('\t', ' ')
-    while '  ' in text:
-        text = text.replace('  ', ' ')
-    return text.strip()
-
-
 def backup_file(file_path: Path, backup_dir: Path) -> Path | None:
     """Backup a file if it exists. Returns backup path or None."""
     if not file_path.exists():
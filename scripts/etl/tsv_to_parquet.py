@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Convert TSV files to Parquet (or pickle) copies for faster re-reads.
+
+category_pattern_analysis.py and optimize_correction_fine.py accept the converted
+file in place of the TSV.
+
+Usage:
+    python scripts/etl/tsv_to_parquet.py inputs/datasource.tsv inputs/categories/*.tsv
+
+    # Parquet needs pyarrow or fastparquet; pickle works with pandas alone
+    python scripts/etl/tsv_to_parquet.py -f pickle inputs/datasource.tsv
+"""
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+
+def convert_tsv(tsv_path: Path, fmt: str) -> Path:
+    """Parse one TSV and write it next to the source with a binary suffix."""
+    df = pd.read_csv(tsv_path, sep='\t', low_memory=False)
+    if fmt == 'parquet':
+        out_path = tsv_path.with_suffix('.parquet')
+        df.to_parquet(out_path, compression='zstd', index=False)
+    else:
+        out_path = tsv_path.with_suffix('.pkl')
+        df.to_pickle(out_path)
+    return out_path
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='TSV → Parquet/pickle 변환')
+    parser.add_argument('inputs', nargs='+', help='변환할 TSV 파일')
+    parser.add_argument('--format', '-f', choices=['parquet', 'pickle'],
+                        default='parquet', help='출력 형식 (기본: parquet)')
+    args = parser.parse_args()
+
+    for name in args.inputs:
+        tsv_path = Path(name)
+        try:
+            out_path = convert_tsv(tsv_path, args.format)
+        except ImportError as e:
+            print(f"ERROR: {e}\n  Install pyarrow, or use --format pickle")
+            return 1
+        print(f"  {tsv_path} -> {out_path}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
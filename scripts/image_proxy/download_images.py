@@ -22,6 +22,7 @@ import argparse
 import csv
 import asyncio
 import aiohttp
+import os
 import sys
 from pathlib import Path
 from dataclasses import dataclass
@@ -46,27 +47,52 @@ DEFAULT_OUTPUT_DIR = BASE_DIR / "images"
 RESUME_FILE = BASE_DIR / "image_download_resume.txt"
 FAILED_FILE = BASE_DIR / "image_download_failed.tsv"
 
+STREAM_CHUNK_SIZE = 1 << 16  # 64 KiB
+
+
+async def save_response(response: aiohttp.ClientResponse, filepath: Path):
+    """Stream the response body to disk in chunks instead of buffering it whole.
+    
+    Writes go to a .part file first, so an interrupted download never leaves
+    a truncated image that a later run would skip as already downloaded.
+    """
+    part_path = filepath.with_name(filepath.name + ".part")
+    try:
+        with open(part_path, "wb") as f:
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                # Write in a worker thread so the event loop keeps serving other downloads
+                await asyncio.to_thread(f.write, chunk)
+        part_path.replace(filepath)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
 
 async def download_image(
     session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
     url: str,
     filepath: Path,
     max_retries: int = 3,
     delay: float = 0,
 ) -> bool:
-    """Download a single image with retry logic."""
+    """Download a single image with retry logic.
+    
+    The semaphore caps in-flight requests across all rows; it is released
+    while waiting between retries.
+    """
     for attempt in range(max_retries):
         try:
-            if delay > 0:
-                await asyncio.sleep(delay)
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status == 200:
-                    content = await response.read()
-                    filepath.write_bytes(content)
-                    return True
-                elif response.status == 404:
-                    # Don't retry 404s
-                    return False
+            async with semaphore:
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    if response.status == 200:
+                        await save_response(response, filepath)
+                        return True
+                    elif response.status == 404:
+                        # Don't retry 404s
+                        return False
         except Exception as e:
             if attempt == max_retries - 1:
                 pass  # Final attempt failed
@@ -92,17 +118,20 @@ def get_extension(url: str) -> str:
 
 async def download_row_images(
     session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
     row_id: str,
     urls: list[str],
     output_dir: Path,
+    existing: set[str],
     stats: DownloadStats,
     delay: float = 0,
 ) -> list[str]:
-    """Download all images for a row.
+    """Download all images for a row concurrently.
     
+    `existing` holds the file names already in output_dir; those are skipped.
     Returns list of failed URLs.
     """
-    failed_urls = []
+    jobs = []
     
     for idx, url in enumerate(urls):
         if not url:
@@ -115,15 +144,22 @@ async def download_row_images(
         else:
             filename = f"{row_id}_{idx:02d}{ext}"
         
-        filepath = output_dir / filename
-        
-        if filepath.exists():
+        if filename in existing:
             stats.skipped += 1
             continue
         
-        stats.attempted += 1
-        success = await download_image(session, url, filepath, delay=delay)
+        filepath = output_dir / filename
         
+        stats.attempted += 1
+        jobs.append((url, filepath))
+    
+    results = await asyncio.gather(*(
+        download_image(session, semaphore, url, filepath, delay=delay)
+        for url, filepath in jobs
+    ))
+    
+    failed_urls = []
+    for (url, _), success in zip(jobs, results):
         if success:
             stats.succeeded += 1
         else:
@@ -257,15 +293,24 @@ async def main():
         print("Nothing to download.")
         return
     
-    # Download images
+    # Download images (one directory listing instead of a stat() per file)
+    existing = {entry.name for entry in os.scandir(args.output)}
     stats = DownloadStats()
+    semaphore = asyncio.Semaphore(args.concurrent)
     connector = aiohttp.TCPConnector(limit=args.concurrent)
     
     async with aiohttp.ClientSession(connector=connector) as session:
-        for i, (row_id, urls) in enumerate(rows_to_process):
-            failed_urls = await download_row_images(
-                session, row_id, urls, args.output, stats, delay=args.delay
-            )
+        # Start every row at once so a slow URL in one row doesn't hold up the next;
+        # the semaphore bounds concurrency, and results are consumed in input order
+        # so the resume point only ever advances past fully processed rows.
+        tasks = [
+            asyncio.create_task(download_row_images(
+                session, semaphore, row_id, urls, args.output, existing, stats, delay=args.delay
+            ))
+            for row_id, urls in rows_to_process
+        ]
+        for i, ((row_id, _), task) in enumerate(zip(rows_to_process, tasks)):
+            failed_urls = await task
             
             # Record failed items
             if failed_urls:
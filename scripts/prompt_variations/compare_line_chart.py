@@ -15,26 +15,53 @@ Usage:
         -i .local/prompt_results/.../comparison.tsv \
         -t "이어폰팁 카테고리"
 
-    # Batch
-    find .local/prompt_results -name "comparison.tsv" | while read f; do
-        uv run python scripts/prompt_variations/compare_line_chart.py -i "$f"
-    done
+    # Batch (files are processed in parallel; charts go next to each input)
+    uv run python scripts/prompt_variations/compare_line_chart.py \
+        -B ".local/prompt_results/**/comparison.tsv"
 """
 
 from __future__ import annotations
 
 import argparse
-import csv
+import io
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
+from glob import glob
 from pathlib import Path
 
+import matplotlib
+matplotlib.use("Agg")  # Charts are only saved to PNG; skip GUI backend discovery
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import numpy as np
+import pandas as pd
+
+try:
+    # Arrow's multithreaded CSV reader when available; otherwise pandas' C parser
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+# Long error lines: simplify sub-pixel segments and render paths in chunks
+plt.rcParams["path.simplify_threshold"] = 1.0
+plt.rcParams["agg.path.chunksize"] = 10000
 
+# Numeric columns read from comparison.tsv (missing or unparsable values → 0)
+ERROR_COLUMNS = ["old_weight_error", "new_weight_error", "old_volume_error", "new_volume_error"]
+DIMENSION_COLUMNS = {
+    "actual": ["actual_d1", "actual_d2", "actual_d3"],
+    "old": ["old_width_cm", "old_depth_cm", "old_height_cm"],
+    "new": ["new_width_cm", "new_depth_cm", "new_height_cm"],
+}
 
+
+@lru_cache(maxsize=1)
 def setup_korean_font():
-    """Setup Korean font for matplotlib."""
+    """Setup Korean font for matplotlib (registers the font once per process)."""
     font_paths = [
         "/System/Library/Fonts/AppleSDGothicNeo.ttc",
         "/System/Library/Fonts/Supplemental/AppleGothic.ttf",
@@ -48,87 +75,44 @@ def setup_korean_font():
     plt.rcParams["axes.unicode_minus"] = False
 
 
-def safe_float(value: str, default: float = 0.0) -> float:
-    """Safely convert string to float."""
-    try:
-        return float(value) if value else default
-    except (ValueError, TypeError):
-        return default
-
-
-def load_comparison_data(file_path: str) -> list[dict]:
-    """Load comparison TSV file."""
-    data = []
-    with open(file_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f, delimiter="\t")
-        for row in reader:
-            data.append(row)
-    return data
+def load_comparison_data(file_path: str) -> pd.DataFrame:
+    """Load the numeric columns of a comparison TSV file."""
+    columns = ERROR_COLUMNS + [c for cols in DIMENSION_COLUMNS.values() for c in cols]
+    # Explicit column list from the header: the pyarrow engine rejects callable
+    # usecols and names that are not in the file
+    header = pd.read_csv(file_path, sep="\t", nrows=0).columns
+    usecols = [c for c in columns if c in header]
+    df = pd.read_csv(file_path, sep="\t", usecols=usecols, dtype=str, engine=CSV_ENGINE)
+    return df.reindex(columns=columns).apply(pd.to_numeric, errors="coerce").fillna(0.0)
 
 
-def sort_dimensions(d1: float, d2: float, d3: float) -> tuple[float, float, float]:
-    """Sort dimensions into (max, mid, min)."""
-    dims = sorted([d1, d2, d3], reverse=True)
-    return dims[0], dims[1], dims[2]
+def sorted_dimensions(df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """Sort each row's three dimensions into (max, mid, min)."""
+    return np.sort(df[columns].to_numpy(), axis=1)[:, ::-1]
 
 
-def calculate_dimension_errors(data: list[dict]) -> dict:
+def calculate_dimension_errors(df: pd.DataFrame) -> dict:
     """Calculate dimension errors (max, mid, min) for old and new prompts."""
-    results = {
-        "old_max": [], "old_mid": [], "old_min": [],
-        "new_max": [], "new_mid": [], "new_min": [],
-    }
+    actual = sorted_dimensions(df, DIMENSION_COLUMNS["actual"])
+    has_actual = (actual > 0).all(axis=1)
     
-    for d in data:
-        # Actual dimensions
-        actual_d1 = safe_float(d.get("actual_d1", 0))
-        actual_d2 = safe_float(d.get("actual_d2", 0))
-        actual_d3 = safe_float(d.get("actual_d3", 0))
-        
-        if actual_d1 <= 0 or actual_d2 <= 0 or actual_d3 <= 0:
-            # Append 0 to keep alignment
-            for key in results:
-                results[key].append(0)
-            continue
-        
-        actual_max, actual_mid, actual_min = sort_dimensions(actual_d1, actual_d2, actual_d3)
-        
-        # Old prompt dimensions
-        old_w = safe_float(d.get("old_width_cm", 0))
-        old_d = safe_float(d.get("old_depth_cm", 0))
-        old_h = safe_float(d.get("old_height_cm", 0))
-        
-        if old_w > 0 and old_d > 0 and old_h > 0:
-            old_max, old_mid, old_min = sort_dimensions(old_w, old_d, old_h)
-            results["old_max"].append((old_max - actual_max) / actual_max)
-            results["old_mid"].append((old_mid - actual_mid) / actual_mid)
-            results["old_min"].append((old_min - actual_min) / actual_min)
-        else:
-            results["old_max"].append(0)
-            results["old_mid"].append(0)
-            results["old_min"].append(0)
-        
-        # New prompt dimensions
-        new_w = safe_float(d.get("new_width_cm", 0))
-        new_d = safe_float(d.get("new_depth_cm", 0))
-        new_h = safe_float(d.get("new_height_cm", 0))
-        
-        if new_w > 0 and new_d > 0 and new_h > 0:
-            new_max, new_mid, new_min = sort_dimensions(new_w, new_d, new_h)
-            results["new_max"].append((new_max - actual_max) / actual_max)
-            results["new_mid"].append((new_mid - actual_mid) / actual_mid)
-            results["new_min"].append((new_min - actual_min) / actual_min)
-        else:
-            results["new_max"].append(0)
-            results["new_mid"].append(0)
-            results["new_min"].append(0)
+    results = {}
+    for prefix in ("old", "new"):
+        estimated = sorted_dimensions(df, DIMENSION_COLUMNS[prefix])
+        # Rows without all three actual or estimated dimensions stay 0 to keep alignment
+        valid = has_actual & (estimated > 0).all(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            errors = np.where(valid[:, None], (estimated - actual) / actual, 0.0)
+        results[f"{prefix}_max"] = errors[:, 0]
+        results[f"{prefix}_mid"] = errors[:, 1]
+        results[f"{prefix}_min"] = errors[:, 2]
     
     return results
 
 
 def plot_line_chart(
-    old_errors: list[float],
-    new_errors: list[float],
+    old_errors: np.ndarray,
+    new_errors: np.ndarray,
     output_path: str,
     title: str = "",
     subtitle: str = "",
@@ -184,24 +168,20 @@ def run_comparison(
     print("-" * 80)
     
     # Load data
-    data = load_comparison_data(input_file)
-    print(f"Loaded {len(data)} records")
+    df = load_comparison_data(input_file)
+    print(f"Loaded {len(df)} records")
     
-    if len(data) == 0:
+    if len(df) == 0:
         print("No data!")
         return 0
     
     # Calculate dimension errors
-    dim_errors = calculate_dimension_errors(data)
+    dim_errors = calculate_dimension_errors(df)
     
     # Define all metrics: (old_errors, new_errors, metric_name, filename_prefix)
     metrics = [
-        ([safe_float(d["old_weight_error"]) for d in data],
-         [safe_float(d["new_weight_error"]) for d in data],
-         "무게", "weight"),
-        ([safe_float(d["old_volume_error"]) for d in data],
-         [safe_float(d["new_volume_error"]) for d in data],
-         "부피", "volume"),
+        (df["old_weight_error"].to_numpy(), df["new_weight_error"].to_numpy(), "무게", "weight"),
+        (df["old_volume_error"].to_numpy(), df["new_volume_error"].to_numpy(), "부피", "volume"),
         (dim_errors["old_max"], dim_errors["new_max"], "Max 치수", "dim_max"),
         (dim_errors["old_mid"], dim_errors["new_mid"], "Mid 치수", "dim_mid"),
         (dim_errors["old_min"], dim_errors["new_min"], "Min 치수", "dim_min"),
@@ -223,9 +203,10 @@ def run_comparison(
         )
         
         # 2. Sorted by old error (descending: + → 0 → -)
-        sorted_indices = sorted(range(len(old_errors)), key=lambda i: old_errors[i], reverse=True)
-        old_errors_sorted = [old_errors[i] for i in sorted_indices]
-        new_errors_sorted = [new_errors[i] for i in sorted_indices]
+        # (stable, so ties keep their original order)
+        sorted_indices = np.argsort(-old_errors, kind="stable")
+        old_errors_sorted = old_errors[sorted_indices]
+        new_errors_sorted = new_errors[sorted_indices]
         
         plot_line_chart(
             old_errors_sorted,
@@ -236,20 +217,66 @@ def run_comparison(
         )
         
         # Print summary for this metric
-        old_mae = np.mean([abs(e) for e in old_errors])
-        new_mae = np.mean([abs(e) for e in new_errors])
-        improved = sum(1 for o, n in zip(old_errors, new_errors) if abs(n) < abs(o))
-        print(f"{metric_name}: MAE {old_mae*100:.1f}% → {new_mae*100:.1f}%, Improved {improved}/{len(data)}")
+        old_abs = np.abs(old_errors)
+        new_abs = np.abs(new_errors)
+        old_mae = old_abs.mean()
+        new_mae = new_abs.mean()
+        improved = np.count_nonzero(new_abs < old_abs)
+        print(f"{metric_name}: MAE {old_mae*100:.1f}% → {new_mae*100:.1f}%, Improved {improved}/{len(df)}")
+    
+    return len(df)
+
+
+def run_batch_item(input_file: str, title: str = "") -> tuple[int, str]:
+    """Run one batch comparison, returning its record count and captured log."""
+    log = io.StringIO()
+    with redirect_stdout(log):
+        try:
+            count = run_comparison(
+                input_file=input_file,
+                output_dir=str(Path(input_file).parent),
+                title=title,
+            )
+        except Exception as e:
+            print(f"Error: {input_file} - {e}")
+            count = 0
+    return count, log.getvalue()
+
+
+def run_batch(pattern: str, title: str = "") -> int:
+    """Run comparisons for every file matching a glob pattern in parallel.
+    
+    Returns the number of files that produced charts.
+    """
+    input_files = sorted(glob(pattern, recursive=True))
+    if not input_files:
+        print(f"No files matched: {pattern}")
+        return 0
     
-    return len(data)
+    # Files are independent; logs are printed in input order once each finishes
+    done = 0
+    with ProcessPoolExecutor(max_workers=min(len(input_files), os.cpu_count() or 1)) as executor:
+        jobs = [executor.submit(run_batch_item, input_file, title) for input_file in input_files]
+        for job in jobs:
+            count, log = job.result()
+            print(log, end="")
+            if count > 0:
+                done += 1
+    
+    print(f"Batch complete: {done}/{len(input_files)} files")
+    return done
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Generate line chart comparison of old vs new estimation errors"
     )
-    parser.add_argument("-i", "--input", required=True,
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("-i", "--input",
                         help="Comparison TSV file from merge_results.py")
+    source.add_argument("-B", "--batch", metavar="PATTERN",
+                        help="Glob pattern of comparison TSV files to process in parallel "
+                             "(charts are saved next to each file; ** is supported)")
     parser.add_argument("-o", "--output",
                         help="Output directory (default: same as input)")
     parser.add_argument("-t", "--title", default="",
@@ -257,6 +284,12 @@ def main():
     
     args = parser.parse_args()
     
+    if args.batch:
+        if args.output:
+            parser.error("-o/--output cannot be used with --batch")
+        done = run_batch(args.batch, title=args.title)
+        sys.exit(0 if done > 0 else 1)
+    
     # Default output: same directory as input
     if args.output:
         output_dir = args.output
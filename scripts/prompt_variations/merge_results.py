@@ -32,6 +32,7 @@ from __future__ import annotations
 import argparse
 import csv
 import sys
+from operator import itemgetter
 from pathlib import Path
 
 
@@ -50,15 +51,47 @@ def calculate_error(estimated: float, actual: float) -> float:
     return (estimated - actual) / actual
 
 
-def load_tsv_as_dict(file_path: str, key_column: str) -> dict[str, dict]:
-    """Load TSV file into dict keyed by specified column."""
+def column_picker(header: list[str], columns: list[str]) -> itemgetter:
+    """
+    Build a getter returning `columns` from a csv.reader row as a tuple.
+    
+    Columns absent from the header map to index len(header), which
+    `normalize_row` fills with "".
+    """
+    index = {name: i for i, name in enumerate(header)}
+    return itemgetter(*(index.get(c, len(header)) for c in columns))
+
+
+def normalize_row(row: list[str], width: int) -> list[str]:
+    """Pad/truncate a row to `width` fields (like DictReader) plus an empty slot for missing columns."""
+    if len(row) != width:
+        row = (row + [""] * width)[:width]
+    row.append("")
+    return row
+
+
+def load_tsv_as_dict(
+    file_path: str,
+    key_column: str,
+    columns: list[str],
+) -> dict[str, tuple]:
+    """
+    Load TSV file into dict keyed by specified column.
+    
+    Only `columns` are kept per row, as a tuple in that order (smaller join build side).
+    """
     data = {}
     with open(file_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f, delimiter="\t")
+        reader = csv.reader(f, delimiter="\t")
+        header = next(reader, [])
+        width = len(header)
+        pick = column_picker(header, [key_column] + columns)
         for row in reader:
-            key = row.get(key_column, "")
+            if not row:
+                continue
+            key, *values = pick(normalize_row(row, width))
             if key:
-                data[key] = row
+                data[key] = tuple(values)
     return data
 
 
@@ -71,7 +104,11 @@ def merge_and_compare(
     
     # Load result file
     print(f"Loading result: {result_file}")
-    result_data = load_tsv_as_dict(result_file, "order_id")
+    result_data = load_tsv_as_dict(
+        result_file,
+        "order_id",
+        columns=["new_weight_kg", "new_width_cm", "new_depth_cm", "new_height_cm", "new_reason"],
+    )
     print(f"  -> {len(result_data)} records")
     
     # Ensure output directory exists
@@ -114,45 +151,71 @@ def merge_and_compare(
         "new_reason",
     ]
     
+    # Datasource fields in extraction order (positions resolved once from the header)
+    source_columns = [
+        "order_id",
+        "title_origin",
+        "category",
+        "actual_weight",
+        "actual_d1",
+        "actual_d2",
+        "actual_d3",
+        "actual_volume_cm3",
+        "ai_weight_kg",
+        "ai_width_cm",
+        "ai_depth_cm",
+        "ai_height_cm",
+        "ai_volume_cm3",
+    ]
+    
     matched = 0
     
     print(f"Processing datasource: {datasource_file}")
     
     with open(output_file, "w", encoding="utf-8", newline="") as out_f:
-        writer = csv.DictWriter(out_f, fieldnames=output_columns, delimiter="\t")
-        writer.writeheader()
+        writer = csv.writer(out_f, delimiter="\t")
+        writer.writerow(output_columns)
         
         with open(datasource_file, "r", encoding="utf-8") as ds_f:
-            reader = csv.DictReader(ds_f, delimiter="\t")
+            reader = csv.reader(ds_f, delimiter="\t")
+            header = next(reader, [])
+            width = len(header)
+            pick = column_picker(header, source_columns)
             
             for row in reader:
-                order_id = row.get("order_id", "")
-                
-                # Skip if no matching result
-                if order_id not in result_data:
+                if not row:
                     continue
+                (
+                    order_id, title_origin, category,
+                    actual_weight, actual_d1, actual_d2, actual_d3, actual_volume,
+                    old_weight, old_width, old_depth, old_height, old_volume,
+                ) = pick(normalize_row(row, width))
                 
-                result = result_data[order_id]
+                # Skip if no matching result (get: repeated datasource order_ids all join)
+                result = result_data.get(order_id)
+                if result is None:
+                    continue
                 
                 # Extract actual values
-                actual_weight = safe_float(row.get("actual_weight", ""))
-                actual_d1 = safe_float(row.get("actual_d1", ""))
-                actual_d2 = safe_float(row.get("actual_d2", ""))
-                actual_d3 = safe_float(row.get("actual_d3", ""))
-                actual_volume = safe_float(row.get("actual_volume_cm3", ""))
+                actual_weight = safe_float(actual_weight)
+                actual_d1 = safe_float(actual_d1)
+                actual_d2 = safe_float(actual_d2)
+                actual_d3 = safe_float(actual_d3)
+                actual_volume = safe_float(actual_volume)
                 
                 # Extract old AI values
-                old_weight = safe_float(row.get("ai_weight_kg", ""))
-                old_width = safe_float(row.get("ai_width_cm", ""))
-                old_depth = safe_float(row.get("ai_depth_cm", ""))
-                old_height = safe_float(row.get("ai_height_cm", ""))
-                old_volume = safe_float(row.get("ai_volume_cm3", ""))
+                old_weight = safe_float(old_weight)
+                old_width = safe_float(old_width)
+                old_depth = safe_float(old_depth)
+                old_height = safe_float(old_height)
+                old_volume = safe_float(old_volume)
                 
                 # Extract new AI values
-                new_weight = safe_float(result.get("new_weight_kg", ""))
-                new_width = safe_float(result.get("new_width_cm", ""))
-                new_depth = safe_float(result.get("new_depth_cm", ""))
-                new_height = safe_float(result.get("new_height_cm", ""))
+                new_weight, new_width, new_depth, new_height, new_reason = result
+                new_weight = safe_float(new_weight)
+                new_width = safe_float(new_width)
+                new_depth = safe_float(new_depth)
+                new_height = safe_float(new_height)
                 new_volume = new_width * new_depth * new_height
                 
                 # Calculate errors
@@ -165,33 +228,34 @@ def merge_and_compare(
                 weight_improved = abs(new_weight_error) < abs(old_weight_error)
                 volume_improved = abs(new_volume_error) < abs(old_volume_error)
                 
-                writer.writerow({
-                    "order_id": order_id,
-                    "title_origin": row.get("title_origin", ""),
-                    "category": row.get("category", ""),
-                    "actual_weight": actual_weight,
-                    "actual_d1": actual_d1,
-                    "actual_d2": actual_d2,
-                    "actual_d3": actual_d3,
-                    "actual_volume_cm3": actual_volume,
-                    "old_weight_kg": old_weight,
-                    "old_width_cm": old_width,
-                    "old_depth_cm": old_depth,
-                    "old_height_cm": old_height,
-                    "old_volume_cm3": old_volume,
-                    "new_weight_kg": new_weight,
-                    "new_width_cm": new_width,
-                    "new_depth_cm": new_depth,
-                    "new_height_cm": new_height,
-                    "new_volume_cm3": new_volume,
-                    "old_weight_error": f"{old_weight_error:.4f}",
-                    "new_weight_error": f"{new_weight_error:.4f}",
-                    "old_volume_error": f"{old_volume_error:.4f}",
-                    "new_volume_error": f"{new_volume_error:.4f}",
-                    "weight_improved": "1" if weight_improved else "0",
-                    "volume_improved": "1" if volume_improved else "0",
-                    "new_reason": result.get("new_reason", ""),
-                })
+                # Same order as output_columns
+                writer.writerow((
+                    order_id,
+                    title_origin,
+                    category,
+                    actual_weight,
+                    actual_d1,
+                    actual_d2,
+                    actual_d3,
+                    actual_volume,
+                    old_weight,
+                    old_width,
+                    old_depth,
+                    old_height,
+                    old_volume,
+                    new_weight,
+                    new_width,
+                    new_depth,
+                    new_height,
+                    new_volume,
+                    f"{old_weight_error:.4f}",
+                    f"{new_weight_error:.4f}",
+                    f"{old_volume_error:.4f}",
+                    f"{new_volume_error:.4f}",
+                    "1" if weight_improved else "0",
+                    "1" if volume_improved else "0",
+                    new_reason,
+                ))
                 
                 matched += 1
     